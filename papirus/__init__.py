@@ -1,5 +1,6 @@
 __version__ = '1.0.0'
 from papirus.lm75b import LM75B
+from papirus.rtc import MCP7940N
 from papirus.epd import EPD
 from papirus.text import PapirusText
 from papirus.image import PapirusImage
@@ -8,9 +9,16 @@ from papirus.composite import PapirusComposite
 from papirus.readrtc import get_hwclock
 from papirus.panel import Panel
 from papirus.emulated import EmulatedPanel
+from papirus.assets import AssetCache
+from papirus.pages import PageCache
+from papirus.animation import AnimationPlayer
+from papirus.multipanel import PanelGroup
+from papirus.slideshow import Slideshow
+from papirus.scheduler import TickScheduler
 
 __all__ = [
     'LM75B',
+    'MCP7940N',
     'EPD',
     'PapirusText',
     'PapirusImage',
@@ -18,5 +26,11 @@ __all__ = [
     'PapirusComposite',
     'Panel',
     'EmulatedPanel',
+    'AssetCache',
+    'PageCache',
+    'AnimationPlayer',
+    'PanelGroup',
+    'Slideshow',
+    'TickScheduler',
     'get_hwclock'
 ]
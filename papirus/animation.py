@@ -0,0 +1,138 @@
+from __future__ import division
+
+import time
+
+from PIL import Image
+from PIL import ImageOps
+from PIL import ImageSequence
+
+from papirus.loader import load_image, scale_image
+
+
+def gif_frames(path, size, fps=None):
+    """
+    Generate (duration, load) pairs for the frames of an animated GIF
+
+    duration is taken from the GIF unless fps is given. load() converts the
+    frame for the panel, so frames that end up being dropped are never
+    scaled or dithered.
+    """
+    with Image.open(path) as im:
+        for frame in ImageSequence.Iterator(im):
+            if fps:
+                duration = 1.0 / fps
+            else:
+                duration = frame.info.get('duration', 0)
+                # like browsers, treat very short or missing durations as 100 ms
+                duration = (duration if duration > 10 else 100) / 1000.0
+            # copy now, the sequence iterator reuses the frame
+            frame = frame.copy()
+            yield duration, lambda frame=frame: scale_image(ImageOps.grayscale(frame), size)
+
+
+def sequence_frames(paths, size, fps=10):
+    """Generate (duration, load) pairs for a list of image files"""
+    for path in paths:
+        yield 1.0 / fps, lambda path=path: load_image(path, size)
+
+
+class PlaybackStats(object):
+    def __init__(self):
+        self.shown = 0
+        self.dropped = 0
+        self.elapsed = 0.0
+        self.refresh_time = 0.0
+
+    @property
+    def fps(self):
+        if self.elapsed <= 0:
+            return 0.0
+        return self.shown / self.elapsed
+
+    @property
+    def mean_refresh_time(self):
+        if self.shown == 0:
+            return 0.0
+        return self.refresh_time / self.shown
+
+    def __repr__(self):
+        return 'PlaybackStats(shown={s:d}, dropped={d:d}, fps={f:.2f}, refresh={r:.3f}s)'.format(
+            s=self.shown, d=self.dropped, f=self.fps, r=self.mean_refresh_time)
+
+
+class AnimationPlayer(object):
+    """
+    Plays a stream of frames in step with the wall clock
+
+    to use:
+      from papirus.animation import AnimationPlayer, gif_frames
+
+      player = AnimationPlayer(panel, [update='partial'|'fast'|'full'], [full_update_every=10])
+      stats = player.play(gif_frames('/path/to/anim.gif', panel.size))
+      print(stats.fps, stats.dropped)
+
+    Each frame is due at the sum of the durations before it. A frame is
+    held until it is due, and frames whose slot has already passed by the
+    time the panel is free are dropped, so the animation keeps real time
+    whatever the refresh speed of the panel.
+    """
+
+    UPDATE_MODES = ('partial', 'fast', 'full')
+
+    def __init__(self, panel, update='partial', full_update_every=10, clock=time.monotonic, sleep=time.sleep):
+        if update not in self.UPDATE_MODES:
+            raise ValueError('update can only be partial, fast or full')
+
+        self.panel = panel
+        self.update = update
+        # periodic full updates to clean up ghosting, 0 to disable
+        self.full_update_every = full_update_every
+        self._clock = clock
+        self._sleep = sleep
+
+    def play(self, frames, loop=False):
+        """Play frames and return the PlaybackStats
+
+        With loop=True frames must be a callable returning a new frame
+        iterator for every pass, e.g. lambda: gif_frames(path, size).
+        """
+        stats = PlaybackStats()
+        start = self._clock()
+        due = start
+
+        while True:
+            for duration, load in (frames() if loop else frames):
+                next_due = due + duration
+                now = self._clock()
+                if now >= next_due:
+                    # this frame's slot has passed, skip to the next
+                    stats.dropped += 1
+                    due = next_due
+                    continue
+
+                # converted before waiting, so the frame goes out on time
+                image = load()
+                now = self._clock()
+                if now < due:
+                    self._sleep(due - now)
+
+                refresh_start = self._clock()
+                self._show(image, stats.shown)
+                stats.refresh_time += self._clock() - refresh_start
+                stats.shown += 1
+                due = next_due
+
+            if not loop:
+                break
+
+        stats.elapsed = self._clock() - start
+        return stats
+
+    def _show(self, image, count):
+        self.panel.display(image)
+        if self.update == 'full' or (self.full_update_every and count % self.full_update_every == 0):
+            self.panel.update()
+        elif self.update == 'fast':
+            self.panel.fast_update()
+        else:
+            self.panel.partial_update()
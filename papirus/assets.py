@@ -0,0 +1,181 @@
+import hashlib
+import os
+import tempfile
+import threading
+
+from collections import OrderedDict
+from io import BytesIO
+
+from PIL import Image
+
+from papirus.bitmap import BITMAP_EXTENSION, BitmapError, is_bitmap, load_bitmap, save_bitmap, unpack_bitmap
+from papirus.loader import open_image, scale_image
+from papirus.panel import Panel
+
+
+class AssetCache(object):
+    """
+    Cache of converted single bit images, keyed by source, target size,
+    rotation and dither mode
+
+    to use:
+      from papirus.assets import AssetCache
+
+      cache = AssetCache([max_items=64], [cache_dir='/var/cache/papirus'], [key_by='mtime'|'hash'],
+                         [max_disk_items=1024])
+
+      icon = cache.load('/path/to/icon.png', (32, 32))
+
+    Path sources are keyed by path + mtime (or by a content hash when
+    key_by='hash'), file-like sources always by content hash. Converted
+    bitmaps are held in memory with LRU eviction and, when cache_dir is
+    set, also stored on disk so they survive restarts. Editing a source
+    file gives it a new key, so the disk cache keeps at most
+    max_disk_items files (None for no limit), dropping the least
+    recently used.
+    """
+
+    def __init__(self, max_items=64, cache_dir=None, key_by='mtime', max_disk_items=1024):
+        if key_by not in ('mtime', 'hash'):
+            raise ValueError('key_by can only be mtime or hash')
+
+        self.max_items = max_items
+        self.cache_dir = cache_dir
+        self.key_by = key_by
+        self.max_disk_items = max_disk_items
+        self.hits = 0
+        self.misses = 0
+
+        self._images = OrderedDict()
+        self._lock = threading.Lock()
+
+        if self.cache_dir is not None and not os.path.isdir(self.cache_dir):
+            os.makedirs(self.cache_dir)
+
+    def __len__(self):
+        return len(self._images)
+
+    def load(self, source, size, rotation=0, dither=Image.FLOYDSTEINBERG, fit=False):
+        """Return source converted to a single bit image of the given size
+
+        When fit is True the aspect ratio is kept and the image is centred
+        on a white background of size, otherwise it is stretched to size.
+        """
+        source_key, data = self._source_key(source)
+        key = (source_key, tuple(size), rotation, dither, fit)
+
+        with self._lock:
+            image = self._images.get(key)
+            if image is not None:
+                self._images.move_to_end(key)
+                self.hits += 1
+                return image
+
+        image = self._load_file(key)
+        if image is None:
+            image = self._convert(data if data is not None else source, size, rotation, dither, fit)
+            self._save_file(key, image)
+
+        with self._lock:
+            self.misses += 1
+            self._images[key] = image
+            while self.max_items > 0 and len(self._images) > self.max_items:
+                self._images.popitem(last=False)
+
+        return image
+
+    def clear(self):
+        with self._lock:
+            self._images.clear()
+
+    def _source_key(self, source):
+        # Returns the key for the source and, if it had to be read, its content
+        if isinstance(source, str) and self.key_by == 'mtime':
+            path = os.path.abspath(source)
+            st = os.stat(path)
+            return (path, st.st_mtime_ns, st.st_size), None
+
+        if isinstance(source, str):
+            with open(source, 'rb') as f:
+                data = f.read()
+        else:
+            data = source.read()
+            source.seek(0)
+
+        return hashlib.sha1(data).hexdigest(), data
+
+    @staticmethod
+    def _convert(source, size, rotation, dither, fit):
+        if is_bitmap(source):
+            # already dithered, only scaled when the size differs
+            image = load_bitmap(source) if isinstance(source, str) else unpack_bitmap(source)
+            if image.size != tuple(size):
+                image = scale_image(image.convert('L'), size, 'fit' if fit else 'stretch', dither)
+        else:
+            if isinstance(source, bytes):
+                source = BytesIO(source)
+            image = scale_image(open_image(source, size), size, 'fit' if fit else 'stretch', dither)
+
+        if rotation != 0:
+            image = image.transpose(Panel.rotation_angle(rotation))
+
+        return image
+
+    def _cache_path(self, key):
+        name = hashlib.sha1(repr(key).encode('utf-8')).hexdigest()
+        return os.path.join(self.cache_dir, name + BITMAP_EXTENSION)
+
+    def _load_file(self, key):
+        if self.cache_dir is None:
+            return None
+
+        path = self._cache_path(key)
+        try:
+            image = load_bitmap(path)
+            # the modification time orders the files for eviction
+            os.utime(path)
+        except (IOError, OSError, BitmapError):
+            # missing, or removed by another writer's eviction
+            return None
+
+        return image
+
+    def _save_file(self, key, image):
+        if self.cache_dir is None:
+            return
+
+        # write to a temporary file first so a reader never sees a partial file,
+        # unique so threads or processes saving the same key don't collide
+        fd, tmp_path = tempfile.mkstemp(suffix='.tmp', dir=self.cache_dir)
+        os.close(fd)
+        try:
+            save_bitmap(image, tmp_path)
+            os.rename(tmp_path, self._cache_path(key))
+        except Exception:
+            os.remove(tmp_path)
+            raise
+
+        self._prune_files()
+
+    def _prune_files(self):
+        if self.max_disk_items is None:
+            return
+
+        paths = [os.path.join(self.cache_dir, name) for name in os.listdir(self.cache_dir)
+                 if name.endswith(BITMAP_EXTENSION)]
+        if len(paths) <= self.max_disk_items:
+            return
+
+        def mtime(path):
+            try:
+                return os.stat(path).st_mtime
+            except OSError:
+                return 0
+
+        paths.sort(key=mtime)
+        for path in paths[:len(paths) - self.max_disk_items]:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
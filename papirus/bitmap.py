@@ -0,0 +1,179 @@
+# Compact storage for pre-dithered single bit images
+#
+# File layout (all integers little endian):
+#
+#   magic    4 bytes   'PBIT'
+#   width    uint16
+#   height   uint16
+#   flags    uint8     bit 0 set when the rows are PackBits compressed
+#   reserved 3 bytes
+#   rows     height rows of (width + 7) // 8 bytes, most significant bit
+#            first, 1 = white; the same packing as a PIL '1' image and the
+#            EPD display buffer, so no conversion is needed to show them
+#
+
+from __future__ import division
+
+import mmap
+import struct
+
+from PIL import Image
+
+
+BITMAP_MAGIC = b'PBIT'
+BITMAP_EXTENSION = '.pbit'
+
+BITMAP_FLAG_RLE = 0x01
+
+_HEADER = struct.Struct('<4sHHB3x')
+
+
+class BitmapError(Exception):
+    pass
+
+
+def row_bytes(width):
+    return (width + 7) // 8
+
+
+def pack_bitmap(image, compress=False):
+    """Return a single bit image in the bitmap file format"""
+    if image.mode != '1':
+        raise BitmapError('only single bit images are supported')
+
+    data = image.tobytes()
+    flags = 0
+    if compress:
+        data = _packbits_encode(data)
+        flags |= BITMAP_FLAG_RLE
+
+    return _HEADER.pack(BITMAP_MAGIC, image.width, image.height, flags) + data
+
+
+def unpack_bitmap(data):
+    """Return the PIL single bit image held in bitmap file format data"""
+    width, height, flags = _parse_header(data[:_HEADER.size])
+    length = row_bytes(width) * height
+    rows = data[_HEADER.size:]
+    if flags & BITMAP_FLAG_RLE:
+        rows = _packbits_decode(rows, length)
+    if len(rows) < length:
+        raise BitmapError('truncated bitmap data')
+
+    return Image.frombytes('1', (width, height), bytes(rows[:length]))
+
+
+def save_bitmap(image, path, compress=False):
+    """Save a single bit image, optionally PackBits compressed"""
+    data = pack_bitmap(image, compress)
+    with open(path, 'wb') as f:
+        f.write(data)
+
+
+def load_packed(path):
+    """Return (size, rows) with rows being the packed bitmap rows
+
+    Uncompressed files are memory-mapped, so rows is a read-only view of
+    the file rather than a copy.
+    """
+    with open(path, 'rb') as f:
+        width, height, flags = _parse_header(f.read(_HEADER.size))
+
+        length = row_bytes(width) * height
+        if flags & BITMAP_FLAG_RLE:
+            rows = _packbits_decode(f.read(), length)
+        else:
+            mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            rows = memoryview(mapped)[_HEADER.size:_HEADER.size + length]
+
+    if len(rows) != length:
+        raise BitmapError('truncated bitmap data')
+
+    return (width, height), rows
+
+
+def load_bitmap(path):
+    """Load a bitmap file as a PIL single bit image"""
+    size, rows = load_packed(path)
+    return Image.frombytes('1', size, bytes(rows))
+
+
+def is_bitmap(source):
+    """True for a path ending in .pbit or for data starting with the bitmap magic"""
+    if isinstance(source, str):
+        return source.endswith(BITMAP_EXTENSION)
+    return isinstance(source, (bytes, bytearray, memoryview)) and bytes(source[:4]) == BITMAP_MAGIC
+
+
+def _parse_header(header):
+    if len(header) != _HEADER.size:
+        raise BitmapError('truncated bitmap header')
+    magic, width, height, flags = _HEADER.unpack(header)
+    if magic != BITMAP_MAGIC:
+        raise BitmapError('not a bitmap file')
+    return width, height, flags
+
+
+def _packbits_encode(data):
+    out = bytearray()
+    i = 0
+    n = len(data)
+    while i < n:
+        # look for a run of identical bytes
+        run = 1
+        while i + run < n and run < 128 and data[i + run] == data[i]:
+            run += 1
+
+        if run > 1:
+            out.append(257 - run)
+            out.append(data[i])
+            i += run
+            continue
+
+        # otherwise copy literally until the next run of at least 3
+        start = i
+        i += 1
+        while i < n and i - start < 128:
+            if i + 2 < n and data[i] == data[i + 1] == data[i + 2]:
+                break
+            i += 1
+        out.append(i - start - 1)
+        out += data[start:i]
+
+    return bytes(out)
+
+
+def _packbits_decode(data, length):
+    out = bytearray()
+    i = 0
+    n = len(data)
+    while i < n and len(out) < length:
+        header = data[i]
+        i += 1
+        if header < 128:
+            out += data[i:i + header + 1]
+            i += header + 1
+        elif header > 128:
+            out += data[i:i + 1] * (257 - header)
+            i += 1
+        # 128 is a no-op
+
+    return bytes(out)
+
+
+if __name__ == "__main__":
+    import argparse
+
+    from PIL import ImageOps
+
+    p = argparse.ArgumentParser(description='Convert an image to a pre-dithered bitmap file')
+    p.add_argument('source', help='source image (PNG, JPG, BMP, ...)')
+    p.add_argument('dest', help='bitmap file to write')
+    p.add_argument('--size', '-s', type=int, nargs=2, metavar=('W', 'H'), help='resize to W x H')
+    p.add_argument('--compress', '-c', action='store_true', help='PackBits compress the rows')
+    args = p.parse_args()
+
+    img = ImageOps.grayscale(Image.open(args.source))
+    if args.size:
+        img = img.resize(tuple(args.size))
+    save_bitmap(img.convert('1', dither=Image.FLOYDSTEINBERG), args.dest, compress=args.compress)
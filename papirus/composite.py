@@ -1,9 +1,9 @@
 import uuid
 
 from PIL import Image
-from PIL import ImageOps
 
 from papirus import PapirusTextPos
+from papirus.assets import AssetCache
 from papirus.sprite import Sprite
 
 
@@ -15,30 +15,29 @@ class RasterSprite(Sprite):
     """
     A raster image (e.g. PNG, JPG, BMP) object to be drawn on screen
     """
-    def __init__(self, file_path, x, y, size):
+    def __init__(self, file_path, image, x, y, size):
         super().__init__(x, y, size)
         self.path = file_path
+        self.image = image
 
 
 class PapirusComposite(PapirusTextPos):
-    def __init__(self, panel, auto_update=True):
-        super(PapirusComposite, self).__init__(panel, auto_update)
+    def __init__(self, panel, auto_update=True, asset_cache=None, state_path=None):
+        # set before the base class, which may restore sprites in to them
         self.image_cache = dict()
-        self.image = Image.new('1', self.panel.size, WHITE)
+        # converted bitmaps, can be shared between several composites
+        self.asset_cache = asset_cache if asset_cache is not None else AssetCache()
+        super(PapirusComposite, self).__init__(panel, auto_update, state_path)
 
     def add_raster_sprite(self, file_path, x=0, y=0, size=(10, 10), sprite_id=None):
         # Create a new Id if none is supplied
         if sprite_id is None:
             sprite_id = str(uuid.uuid4())
 
-        file_path = Image.open(file_path)
-        file_path = ImageOps.grayscale(file_path)
-        file_path = file_path.resize(size)
-        file_path = file_path.convert("1", dither=Image.FLOYDSTEINBERG)
-
         # If the Id doesn't exist, add it  to the dictionary
         if sprite_id not in self.image_cache:
-            self.image_cache[sprite_id] = RasterSprite(file_path, x, y, size)
+            image = self.asset_cache.load(file_path, size)
+            self.image_cache[sprite_id] = RasterSprite(file_path, image, x, y, size)
             # add the img to the image
             self.draw_sprite_from_cache(sprite_id)
             # Automatically show?
@@ -49,12 +48,8 @@ class PapirusComposite(PapirusTextPos):
         # If the ID supplied is in the dictionary, update the img
         # Currently ONLY the img is update
         if sprite_id in self.image_cache:
-            image = Image.open(image)
-            image = ImageOps.grayscale(image)
-            image = image.resize(self.image_cache[sprite_id].size)
-            image = image.convert("1", dither=Image.FLOYDSTEINBERG)
-
-            self.image_cache[sprite_id].image = image
+            self.image_cache[sprite_id].path = image
+            self.image_cache[sprite_id].image = self.asset_cache.load(image, self.image_cache[sprite_id].size)
 
             # Remove from the old img from the image (that doesn't use the actual img)
             self.erase_sprite_from_image(sprite_id)
@@ -87,3 +82,26 @@ class PapirusComposite(PapirusTextPos):
         y = self.image_cache[sprite_id].y
 
         self.image.paste(self.image_cache[sprite_id].image, (x, y))
+
+    def clear(self):
+        self.image_cache = dict()
+        super(PapirusComposite, self).clear()
+
+    def _sprite_state(self):
+        sprites = super(PapirusComposite, self)._sprite_state()
+        for sprite_id, sprite in self.image_cache.items():
+            # file-like sources can't be saved, the bitmap comes from the frame anyway
+            path = sprite.path if isinstance(sprite.path, str) else None
+            sprites[sprite_id] = {'type': 'raster', 'path': path, 'x': sprite.x, 'y': sprite.y,
+                                  'size': list(sprite.size)}
+        return sprites
+
+    def _restore_sprite(self, sprite_id, data):
+        if data['type'] == 'raster':
+            # cut the bitmap back out of the restored frame instead of decoding the file again
+            x, y = data['x'], data['y']
+            size = tuple(data['size'])
+            image = self.image.crop((x, y, x + size[0], y + size[1]))
+            self.image_cache[sprite_id] = RasterSprite(data['path'], image, x, y, size)
+        else:
+            super(PapirusComposite, self)._restore_sprite(sprite_id, data)
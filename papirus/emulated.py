@@ -1,5 +1,4 @@
-import io
-import shutil
+from collections import deque
 
 from PIL import Image
 
@@ -7,30 +6,67 @@ from papirus.panel import Panel
 
 
 class EmulatedPanel(Panel):
-    def __init__(self, out_path, width, height):
+    """
+    A panel that saves each update as a PNG file
+
+    to use:
+      panel = EmulatedPanel('/tmp/frame-{i}.png', 264, 176)
+
+    The frame is only encoded when one of the updates is called. Writes
+    of part of the frame are pasted over the previous one; regions holds
+    the (frame number, mode, rows) of the last max_regions updates, rows
+    being the (first, last) range written since the previous update or
+    None for a full frame.
+    """
+
+    supports_row_writes = True
+
+    def __init__(self, out_path, width, height, max_regions=1000):
         super(EmulatedPanel, self).__init__(width, height)
         self.out_path = out_path
         self.max_frames = -1
+        self.regions = deque(maxlen=max_regions)
         self._frame = 0
-        self._buffer = None
+        self._image = None
+        self._rows = None
 
         self.clear()
 
     def update(self):
+        self._flush('full')
+
+    def partial_update(self):
+        self._flush('partial')
+
+    def fast_update(self):
+        self._flush('fast')
+
+    def _flush(self, mode):
         out_path = self.out_path.format(i=self._frame)
-        with open(out_path, 'wb') as f:
-            shutil.copyfileobj(self._buffer, f)
+        self._image.save(out_path, format='PNG')
+        self.regions.append((self._frame, mode, self._rows))
+        self._rows = ()
 
         self._frame += 1
         if self.max_frames != -1 and self._frame >= self.max_frames:
             self._frame = 0
 
     def clear(self):
-        self._write(Image.new('1', self.size, self.WHITE))
+        self._write(Image.new('1', self.native_size, self.WHITE))
+
+    def _write(self, image, rows=None):
+        if not isinstance(image, Image.Image):
+            image = Image.frombytes('1', self.native_size, bytes(image))
 
-    def _write(self, image):
-        buf = io.BytesIO()
-        image.save(buf, format='PNG')
-        buf.seek(0)
+        if rows is None:
+            # a copy, as the caller may keep drawing on image
+            self._image = image.copy()
+            self._rows = None
+            return
 
-        self._buffer = buf
+        first, last = rows
+        self._image.paste(image.crop((0, first, image.width, last)), (0, first))
+        if self._rows == ():
+            self._rows = (first, last)
+        elif self._rows is not None:
+            self._rows = (min(self._rows[0], first), max(self._rows[1], last))
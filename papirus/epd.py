@@ -20,6 +20,7 @@ from PIL import Image
 from PIL import ImageOps
 
 from papirus import LM75B
+from papirus.bitmap import row_bytes
 from papirus.panel import Panel, DisplayError
 
 
@@ -43,6 +44,8 @@ class EPD(Panel):
       epd.update()        # refresh the panel image - not needed if auto_update is True
     """
 
+    supports_row_writes = True
+
     PANEL_RE = re.compile('^([A-Za-z]+)\s+(\d+\.\d+)\s+(\d+)x(\d+)\s+COG\s+(\d+)\s+FILM\s+(\d+)\s*$', flags=0)
 
     def __init__(self, epd_path='/dev/epd', rotation=0, auto_update=False):
@@ -86,13 +89,40 @@ class EPD(Panel):
     def film(self):
         return self._film
 
+    @property
+    def stagetime(self):
+        """Duration of each stage of a fast update, in milliseconds"""
+        with open(os.path.join(self._epd_path, 'pu_stagetime'), 'r') as f:
+            return int(f.readline().rstrip('\n'))
+
+    @stagetime.setter
+    def stagetime(self, stagetime):
+        with open(os.path.join(self._epd_path, 'pu_stagetime'), 'wb') as f:
+            f.write(str(int(stagetime)).encode('ISO-8859-1'))
+
     def error_status(self):
         with open(os.path.join(self._epd_path, 'error'), 'r') as f:
             return f.readline().rstrip('\n')
 
-    def _write(self, image):
+    def _write(self, image, rows=None):
+        # packed frames are written straight from their buffer
+        offset = 0
+        if rows is None:
+            data = image.tobytes() if isinstance(image, Image.Image) else image
+        else:
+            # only the changed rows, at their offset in the display buffer
+            first, last = rows
+            stride = row_bytes(self.native_size[0])
+            offset = first * stride
+            if isinstance(image, Image.Image):
+                data = image.crop((0, first, image.width, last)).tobytes()
+            else:
+                data = image[offset:last * stride]
+
         with open(os.path.join(self._epd_path, 'LE', 'display_inverse'), 'r+b') as f:
-            f.write(image.tobytes())
+            if offset:
+                f.seek(offset)
+            f.write(data)
 
     def update(self):
         self._command('U')
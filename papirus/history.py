@@ -0,0 +1,221 @@
+from __future__ import division
+
+import time
+
+from array import array
+
+from PIL import ImageDraw
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+WHITE = 1
+BLACK = 0
+
+
+class SensorHistory(object):
+    """
+    Fixed size ring buffer of timestamped sensor readings
+
+    to use:
+      from papirus.history import SensorHistory
+
+      # a week of one reading per minute, about 120 KB
+      history = SensorHistory(capacity=7 * 24 * 60, interval=60)
+      while True:
+          history.sample()            # reads the LM75B when interval has passed
+          history.render(composite.image, (0, 100, 263, 175), seconds=7 * 24 * 3600)
+          composite.write_all()
+          time.sleep(history.due_in())
+
+    Readings are stored in array module buffers (4 byte values, 8 byte
+    timestamps), so memory use is fixed by capacity however long it runs;
+    once full the oldest readings are overwritten.
+    """
+
+    def __init__(self, capacity=10080, interval=60.0, read=None, clock=time.time):
+        if capacity < 1:
+            raise ValueError('capacity must be at least 1')
+
+        self.capacity = capacity
+        self.interval = interval
+        self._read = read
+        self._clock = clock
+
+        self._values = array('f', [0.0]) * capacity
+        self._times = array('d', [0.0]) * capacity
+        self._start = 0
+        self._count = 0
+        self._sampled_at = None
+
+    def __len__(self):
+        return self._count
+
+    def append(self, value, timestamp=None):
+        if timestamp is None:
+            timestamp = self._clock()
+        i = (self._start + self._count) % self.capacity
+        self._values[i] = value
+        self._times[i] = timestamp
+        if self._count < self.capacity:
+            self._count += 1
+        else:
+            self._start = (self._start + 1) % self.capacity
+
+    def due_in(self):
+        """Seconds until the next sample is due"""
+        if self._sampled_at is None:
+            return 0.0
+        return max(self.interval - (self._clock() - self._sampled_at), 0.0)
+
+    def sample(self, force=False):
+        """Take a reading if interval has passed, returns it or None"""
+        if not force and self.due_in() > 0:
+            return None
+
+        if self._read is None:
+            from papirus.lm75b import LM75B
+
+            self._read = LM75B().getTempCFloat
+
+        value = self._read()
+        self._sampled_at = self._clock()
+        self.append(value, self._sampled_at)
+        return value
+
+    def _at(self, n):
+        # n-th reading, oldest first
+        return (self._start + n) % self.capacity
+
+    def _first_since(self, since):
+        # readings are in time order, so bisect for the first one at or after since
+        lo, hi = 0, self._count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self._times[self._at(mid)] < since:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+
+    def readings(self, seconds=None):
+        """Return (timestamps, values) lists, oldest first, for the last seconds"""
+        first = 0
+        if seconds is not None:
+            first = self._first_since(self._clock() - seconds)
+        indices = [self._at(n) for n in range(first, self._count)]
+        return [self._times[i] for i in indices], [self._values[i] for i in indices]
+
+    def stats(self, seconds=None):
+        """Return (min, max, mean) over the last seconds, None if there are no readings"""
+        values = self.readings(seconds)[1]
+        if not values:
+            return None
+        return min(values), max(values), sum(values) / len(values)
+
+    def downsample(self, buckets, seconds=None):
+        """
+        Split the last seconds (or all readings) in to equal time buckets
+
+        Returns a list of (min, max, mean) per bucket, None for empty ones.
+        Uses NumPy when it is installed, straight over the ring buffers.
+        """
+        first = 0
+        if seconds is not None:
+            first = self._first_since(self._clock() - seconds)
+        if first >= self._count:
+            return [None] * buckets
+
+        if seconds is not None:
+            end = self._clock()
+            start = end - seconds
+        else:
+            start = self._times[self._at(0)]
+            end = self._times[self._at(self._count - 1)]
+        span = max(end - start, 1e-9)
+
+        if np is not None:
+            return self._downsample_numpy(first, buckets, start, span)
+
+        lows = [None] * buckets
+        highs = [None] * buckets
+        sums = [0.0] * buckets
+        counts = [0] * buckets
+        for n in range(first, self._count):
+            i = self._at(n)
+            v = self._values[i]
+            b = min(int((self._times[i] - start) / span * buckets), buckets - 1)
+            if counts[b] == 0:
+                lows[b] = highs[b] = v
+            else:
+                lows[b] = min(lows[b], v)
+                highs[b] = max(highs[b], v)
+            sums[b] += v
+            counts[b] += 1
+
+        return [(lows[b], highs[b], sums[b] / counts[b]) if counts[b] else None for b in range(buckets)]
+
+    def _downsample_numpy(self, first, buckets, start, span):
+        # the ring buffers without copying, then rolled so the oldest reading comes first
+        times = np.roll(np.frombuffer(self._times, dtype=np.float64)[:self._count], -self._start)[first:]
+        values = np.roll(np.frombuffer(self._values, dtype=np.float32)[:self._count], -self._start)[first:]
+
+        index = np.minimum(((times - start) / span * buckets).astype(np.int64), buckets - 1)
+        counts = np.bincount(index, minlength=buckets)
+        sums = np.bincount(index, weights=values, minlength=buckets)
+        lows = np.full(buckets, np.inf)
+        highs = np.full(buckets, -np.inf)
+        np.minimum.at(lows, index, values)
+        np.maximum.at(highs, index, values)
+
+        return [(float(lows[b]), float(highs[b]), float(sums[b] / counts[b])) if counts[b] else None
+                for b in range(buckets)]
+
+    def render(self, image, box, seconds=None, value_range=None, frame=True):
+        """
+        Draw a graph of the last seconds in to box (x1, y1, x2, y2) of image
+
+        Each pixel column shows the min to max range of its readings as a
+        vertical bar with the mean joined up by a line. The vertical scale
+        is value_range (low, high) or else fitted to the readings. Returns
+        the (min, max, mean) of the drawn readings or None.
+        """
+        x1, y1, x2, y2 = box
+        draw = ImageDraw.Draw(image)
+        draw.rectangle(box, fill=WHITE, outline=BLACK if frame else WHITE)
+        if frame:
+            x1, y1, x2, y2 = x1 + 1, y1 + 1, x2 - 1, y2 - 1
+
+        columns = self.downsample(x2 - x1 + 1, seconds)
+        present = [c for c in columns if c is not None]
+        if not present:
+            return None
+
+        low, high = value_range if value_range is not None else (
+            min(c[0] for c in present), max(c[1] for c in present))
+        scale = (y2 - y1) / (high - low) if high > low else 0.0
+
+        def to_y(v):
+            v = min(max(v, low), high)
+            return int(round(y2 - (v - low) * scale)) if scale else (y1 + y2) // 2
+
+        bars = []
+        means = []
+        for x, column in enumerate(columns, x1):
+            if column is None:
+                continue
+            bars.append((x, to_y(column[1]), x, to_y(column[0])))
+            means.append((x, to_y(column[2])))
+
+        for bar in bars:
+            if bar[1] != bar[3]:
+                draw.line(bar, fill=BLACK)
+        if len(means) > 1:
+            draw.line(means, fill=BLACK)
+        else:
+            draw.point(means, fill=BLACK)
+
+        return (min(c[0] for c in present), max(c[1] for c in present),
+                sum(c[2] for c in present) / len(present))
@@ -1,28 +1,14 @@
-from __future__ import division
-
-from PIL import Image
-
-WHITE = 1
+from papirus.assets import AssetCache
 
 
 class PapirusImage(object):
-    def __init__(self, panel):
+    def __init__(self, panel, asset_cache=None):
         self.panel = panel
+        self.asset_cache = asset_cache if asset_cache is not None else AssetCache()
 
     def write(self, imagefile):
-        fileimg = Image.open(imagefile)
-
-        w,h = fileimg.size
-
-        rsimg = fileimg
-        if w > self.panel.width or h > self.panel.height:
-            rsimg.thumbnail(self.panel.size)
-
-        xpadding = (self.panel.width - rsimg.size[0]) // 2
-        ypadding = (self.panel.height - rsimg.size[1]) // 2
-
-        image = Image.new('1', self.panel.size, WHITE)
-        image.paste(rsimg, (xpadding, ypadding))
+        # scaled down (never up) to fit the panel, keeping the aspect ratio, and centred
+        image = self.asset_cache.load(imagefile, self.panel.size, fit=True)
 
         self.panel.display(image)
         self.panel.update()
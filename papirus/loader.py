@@ -0,0 +1,75 @@
+from __future__ import division
+
+from PIL import Image
+from PIL import ImageOps
+
+WHITE = 1
+
+# how an image is made to match the panel size
+FIT_MODES = ('fit', 'crop', 'stretch')
+
+
+def open_image(source, size):
+    """
+    Open an image as grayscale, decoding no more pixels than needed for size
+
+    JPEGs are decoded at a reduced scale (1/2, 1/4 or 1/8) that is still
+    at least size, which is far faster and smaller than decoding a full
+    camera photo and scaling it down afterwards. Other formats are opened
+    normally. EXIF orientation is applied.
+    """
+    image = Image.open(source)
+    # only the JPEG decoder supports this, it is a no-op otherwise
+    image.draft('L', tuple(size))
+    if hasattr(ImageOps, 'exif_transpose'):
+        image = ImageOps.exif_transpose(image)
+
+    if image.mode in ('RGBA', 'LA', 'P'):
+        # flatten any transparency onto white rather than black
+        image = image.convert('RGBA')
+        background = Image.new('RGBA', image.size, (255, 255, 255, 255))
+        image = Image.alpha_composite(background, image)
+
+    return ImageOps.grayscale(image) if image.mode != 'L' else image
+
+
+def scale_image(image, size, mode='fit', dither=Image.FLOYDSTEINBERG):
+    """
+    Scale a grayscale image to size and convert it to a single bit frame
+
+    fit:     keep the aspect ratio, centred on a white background
+    crop:    keep the aspect ratio, fill size and crop the overflow
+    stretch: scale to exactly size
+    """
+    if mode not in FIT_MODES:
+        raise ValueError('mode can only be fit, crop or stretch')
+
+    size = tuple(size)
+    if mode == 'stretch':
+        image = image.resize(size, Image.LANCZOS)
+    elif mode == 'crop':
+        image = ImageOps.fit(image, size, Image.LANCZOS)
+    else:
+        # never scaled up
+        image = image.copy()
+        image.thumbnail(size, Image.LANCZOS)
+
+    image = image.convert('1', dither=dither)
+    if image.size == size:
+        return image
+
+    frame = Image.new('1', size, WHITE)
+    frame.paste(image, ((size[0] - image.size[0]) // 2, (size[1] - image.size[1]) // 2))
+    return frame
+
+
+def load_image(source, size, mode='fit', dither=Image.FLOYDSTEINBERG):
+    """
+    Load an image file as a panel-ready single bit image of the given size
+
+    to use:
+      from papirus.loader import load_image
+
+      panel.display(load_image('/path/to/photo.jpg', panel.size, mode='crop'))
+    """
+    return scale_image(open_image(source, size), size, mode, dither)
@@ -0,0 +1,205 @@
+from __future__ import division
+
+import functools
+import json
+import os
+import threading
+import time
+
+from papirus.bitmap import row_bytes
+
+
+# upper bounds in seconds, refreshes range from tens of ms (fast) to seconds (full)
+DEFAULT_BUCKETS = (0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# panel operations that are timed and the refresh mode they count as
+TIMED_OPERATIONS = ('display', '_write', 'update', 'partial_update', 'fast_update', 'clear')
+REFRESH_MODES = {
+    'update': 'full',
+    'partial_update': 'partial',
+    'fast_update': 'fast',
+    'clear': 'clear',
+}
+
+
+class Histogram(object):
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = tuple(sorted(buckets))
+        self.counts = [0] * len(self.buckets)
+        self.count = 0
+        self.sum = 0.0
+        self.min = None
+        self.max = None
+
+    def observe(self, value):
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[i] += 1
+                break
+        self.count += 1
+        self.sum += value
+        self.min = value if self.min is None else min(self.min, value)
+        self.max = value if self.max is None else max(self.max, value)
+
+    @property
+    def mean(self):
+        return self.sum / self.count if self.count else 0.0
+
+    def as_dict(self):
+        return {
+            'buckets': list(self.buckets),
+            'counts': list(self.counts),
+            'count': self.count,
+            'sum': self.sum,
+            'min': self.min,
+            'max': self.max,
+            'mean': self.mean,
+        }
+
+
+class PanelMetrics(object):
+    """
+    Timing histograms and counters for a panel
+
+    to use:
+      metrics = panel.enable_metrics()
+      metrics.add_hook(lambda op, duration: print(op, duration))
+      ...
+      metrics.write_prometheus('/var/lib/node_exporter/papirus.prom', labels={'panel': 'lobby'})
+
+    Operations are recorded under their method name (display, _write,
+    update, partial_update, fast_update, clear).
+    """
+
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = buckets
+        self.timings = dict()
+        self.refreshes = dict((mode, 0) for mode in REFRESH_MODES.values())
+        self.bytes_written = 0
+        self.errors = 0
+        self._hooks = []
+        self._lock = threading.Lock()
+
+    def add_hook(self, hook):
+        """Call hook(operation, duration) after every timed operation"""
+        self._hooks.append(hook)
+
+    def remove_hook(self, hook):
+        self._hooks.remove(hook)
+
+    def observe(self, operation, duration, nbytes=0):
+        with self._lock:
+            if operation not in self.timings:
+                self.timings[operation] = Histogram(self.buckets)
+            self.timings[operation].observe(duration)
+            self.bytes_written += nbytes
+            if operation in REFRESH_MODES:
+                self.refreshes[REFRESH_MODES[operation]] += 1
+
+        for hook in self._hooks:
+            hook(operation, duration)
+
+    def instrument(self, panel):
+        """Wrap the timed operations of panel so they are recorded here"""
+        for operation in TIMED_OPERATIONS:
+            method = getattr(panel, operation)
+            setattr(panel, operation, self._timed(operation, method))
+
+    def _timed(self, operation, method):
+        @functools.wraps(method)
+        def timed(*args, **kwargs):
+            start = time.monotonic()
+            try:
+                result = method(*args, **kwargs)
+            except Exception:
+                with self._lock:
+                    self.errors += 1
+                raise
+            nbytes = written_bytes(method.__self__, *args, **kwargs) if operation == '_write' else 0
+            self.observe(operation, time.monotonic() - start, nbytes)
+            return result
+
+        return timed
+
+    def as_dict(self):
+        with self._lock:
+            return {
+                'timings': dict((op, h.as_dict()) for op, h in self.timings.items()),
+                'refreshes': dict(self.refreshes),
+                'bytes_written': self.bytes_written,
+                'errors': self.errors,
+            }
+
+    def to_json(self):
+        return json.dumps(self.as_dict(), sort_keys=True)
+
+    def to_prometheus(self, labels=None):
+        """Return the metrics in the Prometheus text exposition format"""
+        def fmt_labels(extra=None):
+            items = sorted((labels or {}).items()) + list(extra or [])
+            if not items:
+                return ''
+            return '{' + ','.join('{k:s}="{v:s}"'.format(k=k, v=str(v)) for k, v in items) + '}'
+
+        data = self.as_dict()
+        lines = [
+            '# HELP papirus_operation_duration_seconds Duration of panel operations.',
+            '# TYPE papirus_operation_duration_seconds histogram',
+        ]
+        for op, h in sorted(data['timings'].items()):
+            cumulative = 0
+            for bound, count in zip(h['buckets'], h['counts']):
+                cumulative += count
+                lines.append('papirus_operation_duration_seconds_bucket{l:s} {c:d}'.format(
+                    l=fmt_labels([('op', op), ('le', repr(float(bound)))]), c=cumulative))
+            lines.append('papirus_operation_duration_seconds_bucket{l:s} {c:d}'.format(
+                l=fmt_labels([('op', op), ('le', '+Inf')]), c=h['count']))
+            lines.append('papirus_operation_duration_seconds_sum{l:s} {s!r}'.format(
+                l=fmt_labels([('op', op)]), s=h['sum']))
+            lines.append('papirus_operation_duration_seconds_count{l:s} {c:d}'.format(
+                l=fmt_labels([('op', op)]), c=h['count']))
+
+        lines.append('# HELP papirus_refreshes_total Panel refreshes by update mode.')
+        lines.append('# TYPE papirus_refreshes_total counter')
+        for mode, count in sorted(data['refreshes'].items()):
+            lines.append('papirus_refreshes_total{l:s} {c:d}'.format(l=fmt_labels([('mode', mode)]), c=count))
+
+        lines.append('# HELP papirus_bytes_written_total Bytes of image data written to the panel.')
+        lines.append('# TYPE papirus_bytes_written_total counter')
+        lines.append('papirus_bytes_written_total{l:s} {c:d}'.format(l=fmt_labels(), c=data['bytes_written']))
+
+        lines.append('# HELP papirus_errors_total Panel operations that raised an error.')
+        lines.append('# TYPE papirus_errors_total counter')
+        lines.append('papirus_errors_total{l:s} {c:d}'.format(l=fmt_labels(), c=data['errors']))
+
+        return '\n'.join(lines) + '\n'
+
+    def write_json(self, path):
+        _write_atomic(path, self.to_json())
+
+    def write_prometheus(self, path, labels=None):
+        """Write a file for the node_exporter textfile collector"""
+        _write_atomic(path, self.to_prometheus(labels))
+
+
+def frame_bytes(image):
+    """Size of the packed single bit data for a frame"""
+    if isinstance(image, memoryview):
+        return image.nbytes
+    width, height = image.size
+    return row_bytes(width) * height
+
+
+def written_bytes(panel, image, rows=None):
+    """Size of the packed single bit data a panel _write sends"""
+    if rows is None:
+        return frame_bytes(image)
+    return row_bytes(panel.native_size[0]) * (rows[1] - rows[0])
+
+
+def _write_atomic(path, text):
+    # write to a temporary file first so a scraper never sees a partial file
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'w') as f:
+        f.write(text)
+    os.rename(tmp_path, path)
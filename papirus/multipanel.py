@@ -0,0 +1,135 @@
+from concurrent.futures import ThreadPoolExecutor
+
+from PIL import Image
+
+from papirus.panel import DisplayError
+
+WHITE = 1
+
+
+class PanelGroup(object):
+    """
+    Drives several panels at once, refreshing them in parallel
+
+    to use:
+      from papirus.multipanel import PanelGroup
+
+      group = PanelGroup()
+      group.add(EPD('/dev/epd'), offset=(0, 0))
+      group.add(EPD('/mnt/epd1'), offset=(264, 0))
+
+      # one image per panel...
+      group.show([image0, image1])
+      # ...the same image on every panel...
+      group.show(image, mirror=True)
+      # ...or one logical canvas spanning the panels at their offsets
+      canvas = group.new_canvas()
+      group.show(canvas)
+
+    Each panel is written and refreshed in its own worker thread, so the
+    group takes about as long as its slowest panel rather than the sum
+    of all of them.
+    """
+
+    UPDATE_MODES = ('full', 'partial', 'fast', None)
+
+    def __init__(self, max_workers=None):
+        self.panels = []
+        self.offsets = []
+        self._max_workers = max_workers
+        self._executor = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def __len__(self):
+        return len(self.panels)
+
+    def add(self, panel, offset=(0, 0)):
+        """Add a panel, offset is its top left corner on the shared canvas"""
+        self.panels.append(panel)
+        self.offsets.append(tuple(offset))
+        # the pool is sized on first use
+        self._shutdown()
+        return panel
+
+    @property
+    def canvas_size(self):
+        width = max([x + p.width for p, (x, y) in zip(self.panels, self.offsets)] or [0])
+        height = max([y + p.height for p, (x, y) in zip(self.panels, self.offsets)] or [0])
+        return width, height
+
+    def new_canvas(self):
+        return Image.new('1', self.canvas_size, WHITE)
+
+    def split(self, canvas):
+        """Cut a canvas into one image per panel"""
+        if canvas.size != self.canvas_size:
+            raise DisplayError('canvas size mismatch')
+        return [canvas.crop((x, y, x + p.width, y + p.height)) for p, (x, y) in zip(self.panels, self.offsets)]
+
+    def show(self, images, update='full', mirror=False):
+        """Write images to the panels and refresh them, all in parallel
+
+        images is a list with one image per panel, a single image shown on
+        every panel when mirror is True, or otherwise a canvas of
+        canvas_size that is split across the panels.
+        """
+        if update not in self.UPDATE_MODES:
+            raise ValueError('update can only be full, partial, fast or None')
+
+        if isinstance(images, (list, tuple)):
+            if len(images) != len(self.panels):
+                raise DisplayError('expected one image per panel')
+        elif mirror:
+            images = [images] * len(self.panels)
+        else:
+            images = self.split(images)
+
+        def show_one(panel, image):
+            panel.display(image)
+            if update == 'full':
+                panel.update()
+            elif update == 'partial':
+                panel.partial_update()
+            elif update == 'fast':
+                panel.fast_update()
+
+        self._run(show_one, zip(self.panels, images))
+
+    def display(self, images, mirror=False):
+        self.show(images, update=None, mirror=mirror)
+
+    def update(self):
+        self._run(lambda panel: panel.update(), ((p,) for p in self.panels))
+
+    def partial_update(self):
+        self._run(lambda panel: panel.partial_update(), ((p,) for p in self.panels))
+
+    def fast_update(self):
+        self._run(lambda panel: panel.fast_update(), ((p,) for p in self.panels))
+
+    def clear(self):
+        self._run(lambda panel: panel.clear(), ((p,) for p in self.panels))
+
+    def close(self):
+        self._shutdown()
+
+    def _run(self, fn, args):
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self._max_workers or max(len(self.panels), 1))
+
+        futures = [self._executor.submit(fn, *a) for a in args]
+        # wait for every panel before reporting the first failure
+        errors = [f.exception() for f in futures]
+        for error in errors:
+            if error is not None:
+                raise error
+
+    def _shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
@@ -0,0 +1,146 @@
+import threading
+
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+
+from papirus.panel import Panel
+from papirus.text import DEFAULT_FONT_PATH, render_text
+
+
+def render_frame(key):
+    """Render the page for key as a packed frame, in the orientation written to the panel"""
+    text, font_path, size, panel_size, rotation, max_lines = key
+    image = render_text(text, panel_size, size, font_path, max_lines)
+    if rotation != 0:
+        image = image.transpose(Panel.rotation_angle(rotation))
+    return image.tobytes()
+
+
+class PageCache(object):
+    """
+    Cache of fully composed text pages, ready to send to a panel
+
+    to use:
+      from papirus.pages import PageCache
+
+      pages = PageCache([max_bytes=1048576], [max_workers=None])
+      text = PapirusText(panel, page_cache=pages)
+      text.prerender([MENU, HELP], 14)       # rendered in other processes
+      text.write(MENU, 14)                   # only a panel write
+
+    Pages are keyed by text, font, size, panel size, rotation and line
+    limit, and stored as packed single bit frames (5.8 KB for a 2.7"
+    panel) so Panel.display writes them without any conversion. The
+    least recently used pages are dropped once more than max_bytes are
+    held. Pre-rendering runs in a process pool, started on first use.
+    """
+
+    def __init__(self, max_bytes=1024 * 1024, max_workers=None):
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+
+        self._frames = OrderedDict()
+        self._bytes = 0
+        self._pending = {}
+        self._lock = threading.Lock()
+        self._max_workers = max_workers
+        self._executor = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def __len__(self):
+        return len(self._frames)
+
+    def __contains__(self, key):
+        return key in self._frames
+
+    @property
+    def size_bytes(self):
+        return self._bytes
+
+    @staticmethod
+    def key(panel, text, size=20, font_path=None, max_lines=100):
+        return text, font_path or DEFAULT_FONT_PATH, size, panel.size, panel.rotation, max_lines
+
+    def get(self, panel, text, size=20, font_path=None, max_lines=100):
+        """Return the packed frame for a page, rendering it if it is not cached"""
+        key = self.key(panel, text, size, font_path, max_lines)
+
+        with self._lock:
+            frame = self._frames.get(key)
+            if frame is not None:
+                self._frames.move_to_end(key)
+                self.hits += 1
+                return frame
+            future = self._pending.pop(key, None)
+            self.misses += 1
+
+        # a page still being pre-rendered is waited for rather than rendered twice
+        frame = future.result() if future is not None else render_frame(key)
+        self._store(key, frame)
+        return frame
+
+    def prerender(self, panel, pages, size=20, font_path=None, max_lines=100):
+        """Start rendering pages that are not cached yet, returns how many were started"""
+        started = []
+        with self._lock:
+            for text in pages:
+                key = self.key(panel, text, size, font_path, max_lines)
+                if key in self._frames or key in self._pending:
+                    continue
+                if self._executor is None:
+                    self._executor = ProcessPoolExecutor(self._max_workers)
+                future = self._executor.submit(render_frame, key)
+                self._pending[key] = future
+                started.append((key, future))
+
+        # outside the lock, a future that is already done runs its callback at once
+        for key, future in started:
+            future.add_done_callback(lambda f, key=key: self._finished(key, f))
+        return len(started)
+
+    def wait(self):
+        """Wait until all pre-rendered pages are in the cache"""
+        with self._lock:
+            pending = list(self._pending.items())
+        for key, future in pending:
+            future.exception()
+            # the done callback may not have run yet
+            self._finished(key, future)
+
+    def clear(self):
+        with self._lock:
+            self._frames.clear()
+            self._bytes = 0
+
+    def close(self):
+        with self._lock:
+            executor, self._executor = self._executor, None
+            self._pending.clear()
+        if executor is not None:
+            executor.shutdown(wait=True)
+
+    def _finished(self, key, future):
+        with self._lock:
+            # get() may already have taken the result
+            if self._pending.get(key) is not future:
+                return
+            del self._pending[key]
+        if not future.cancelled() and future.exception() is None:
+            self._store(key, future.result())
+
+    def _store(self, key, frame):
+        with self._lock:
+            old = self._frames.pop(key, None)
+            if old is not None:
+                self._bytes -= len(old)
+            self._frames[key] = frame
+            self._bytes += len(frame)
+            # the newest page is kept even if it is larger than max_bytes
+            while self._bytes > self.max_bytes and len(self._frames) > 1:
+                self._bytes -= len(self._frames.popitem(last=False)[1])
@@ -5,6 +5,8 @@ from abc import abstractmethod, ABCMeta
 from PIL import Image
 from PIL import ImageOps
 
+from papirus.bitmap import row_bytes
+
 
 class DisplayError(Exception):
     def __init__(self, value):
@@ -18,6 +20,9 @@ class Panel(object):
     WHITE = 1
     BLACK = 0
 
+    # True when _write takes a rows argument and can write part of a frame
+    supports_row_writes = False
+
     def __init__(self, width, height, rotation=0, auto_update=False):
         if width < 1 or height < 1:
             raise DisplayError('invalid panel dimensions')
@@ -30,8 +35,62 @@ class Panel(object):
         self.rotation = rotation
 
         self.auto_update = auto_update
+        self.metrics = None
+
+    def display(self, image, bbox=None, rows=None):
+        """Transfer a frame to the panel
+
+        image can be a PIL image, a 2-D NumPy array of shape (height, width)
+        in which non-zero pixels are white, or a bytes-like object holding
+        the packed single bit rows (1 = white, most significant bit first)
+        in the unrotated orientation of the panel, e.g. from
+        papirus.bitmap.load_packed. Packed frames are written without any
+        copy or conversion.
+
+        When only part of the frame changed since the last display, pass
+        its bounding box (x1, y1, x2, y2, right and bottom exclusive, as
+        returned by TileGrid.render or Image.getbbox) or a range of rows
+        (y1, y2) and, on panels that support it, only the rows of the frame
+        buffer covering it are written. The rest of the buffer must still
+        hold the previous frame. Other panels write the whole frame.
+        """
+        if isinstance(image, (bytes, bytearray, memoryview)):
+            image = self._check_packed(memoryview(image))
+        elif hasattr(image, 'ndim') and hasattr(image, 'dtype'):
+            image = self._pack_array(image)
+        else:
+            image = self._prepare_image(image)
+
+        if rows is not None:
+            bbox = (0, rows[0], self.width, rows[1])
+
+        if bbox is None or not self.supports_row_writes:
+            self._write(image)
+        else:
+            self._write(image, self.native_rows(bbox))
+
+        if self.auto_update:
+            self.update()
 
-    def display(self, image):
+    def native_rows(self, bbox):
+        """Return the (first, last) rows, last exclusive, of the unrotated
+        frame that cover bbox (x1, y1, x2, y2) in panel coordinates"""
+        x1, y1, x2, y2 = bbox
+        if self._rotation == 90:
+            first, last = self._width - x2, self._width - x1
+        elif self._rotation == 180:
+            first, last = self._height - y2, self._height - y1
+        elif self._rotation == 270:
+            first, last = x1, x2
+        else:
+            first, last = y1, y2
+
+        height = self.native_size[1]
+        first = min(max(first, 0), height)
+        last = min(max(last, first), height)
+        return first, last
+
+    def _prepare_image(self, image):
         # attempt grayscale conversion, ath then to single bit
         # better to do this before calling this if the image is to
         # be displayed several times
@@ -47,10 +106,38 @@ class Panel(object):
         if self.rotation != 0:
             image = image.transpose(self.rotation_angle(self._rotation))
 
-        self._write(image)
+        return image
 
-        if self.auto_update:
-            self.update()
+    def _check_packed(self, buf):
+        width, height = self.native_size
+        if buf.nbytes != row_bytes(width) * height:
+            raise DisplayError('packed frame size mismatch')
+        return buf.cast('B') if buf.format != 'B' or buf.ndim != 1 else buf
+
+    def _pack_array(self, array):
+        import numpy as np
+
+        if array.ndim != 2:
+            raise DisplayError('only 2-D arrays are supported')
+        if (array.shape[1], array.shape[0]) != self.size:
+            raise DisplayError('image size mismatch')
+
+        if array.dtype != np.bool_:
+            array = array != 0
+        if self.rotation != 0:
+            # counter-clockwise, like Image.transpose
+            array = np.rot90(array, self.rotation // 90)
+
+        return memoryview(np.packbits(array, axis=1)).cast('B')
+
+    def enable_metrics(self, metrics=None):
+        """Start recording timings and counters, returns the PanelMetrics"""
+        from papirus.metrics import PanelMetrics
+
+        if self.metrics is None:
+            self.metrics = metrics if metrics is not None else PanelMetrics()
+            self.metrics.instrument(self)
+        return self.metrics
 
     @abstractmethod
     def update(self):
@@ -68,6 +155,8 @@ class Panel(object):
 
     @abstractmethod
     def _write(self, image):
+        # with supports_row_writes, also called as _write(image, rows) where rows
+        # is (first, last) of the unrotated frame and only those rows need writing
         pass
 
     @property
@@ -82,6 +171,13 @@ class Panel(object):
     def size(self):
         return self._width, self._height
 
+    @property
+    def native_size(self):
+        # size of the panel before rotation, as the frame is written
+        if self._rotation in (90, 270):
+            return self._height, self._width
+        return self._width, self._height
+
     @property
     def rotation(self):
         return self._rotation
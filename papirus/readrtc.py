@@ -92,11 +92,36 @@ RTC_SET_TIME = _IOW(ord("p"), 0x0a, rtc_time)  # 0x4024700a
 del rtc_time
 
 
-def get_hwclock(devrtc="/dev/rtc"):
-    with open(devrtc) as rtc:
+_open_rtcs = {}
+
+
+def get_hwclock(devrtc="/dev/rtc", keep_open=False):
+    """Read the RTC, with keep_open the device stays open for the next call
+
+    /dev/rtc can only be opened once at a time, so keep_open blocks e.g.
+    hwclock until close_hwclock() is called or the process exits."""
+    rtc = _open_rtcs.get(devrtc)
+    if rtc is not None:
+        return RtcTime.unpack(ioctl(rtc, RTC_RD_TIME, RtcTime().pack())).to_datetime()
+
+    rtc = open(devrtc)
+    try:
         ret = ioctl(rtc, RTC_RD_TIME, RtcTime().pack())
+    except Exception:
+        rtc.close()
+        raise
+    if keep_open:
+        _open_rtcs[devrtc] = rtc
+    else:
+        rtc.close()
     return RtcTime.unpack(ret).to_datetime()
 
 
+def close_hwclock(devrtc="/dev/rtc"):
+    rtc = _open_rtcs.pop(devrtc, None)
+    if rtc is not None:
+        rtc.close()
+
+
 if __name__ == "__main__":
     print("Date/Time from RTC: {d:s}".format(d= get_hwclock().strftime("%A %d %B %Y - %H:%M:%S")))
@@ -0,0 +1,236 @@
+# Support for the MCP7940N real time clock on the Papirus HAT
+#
+# Time, control and both alarms are read and written as block transfers
+# and the control register is cached, so setting an alarm or reading the
+# time is normally a single I2C transaction.
+#
+# Register map (only the part used here):
+#
+#   0x00 - 0x06   time: sec (ST bit), min, hour, wkday (OSCRUN, PWRFAIL, VBATEN), date, month (LPYR), year
+#   0x07          control: OUT, SQWEN, ALM1EN, ALM0EN, EXTOSC, CRSTRIM, SQWFS1, SQWFS0
+#   0x08          oscillator trim
+#   0x0a - 0x0f   alarm 0: sec, min, hour, wkday (ALMPOL, ALM0MSK, ALM0IF), date, month
+#   0x11 - 0x16   alarm 1: as alarm 0
+#
+
+from __future__ import division
+
+from calendar import isleap
+from datetime import datetime
+
+
+MCP7940N_ADDRESS = 0x6f
+
+TIME_REGISTER = 0x00
+CONTROL_REGISTER = 0x07
+ALARM_REGISTERS = (0x0a, 0x11)
+REGISTER_COUNT = 0x17
+
+ST_BIT = 0x80
+LPYR_BIT = 0x20
+WKDAY_STATUS_BITS = 0x38
+
+CONTROL_OUT = 0x80
+CONTROL_SQWEN = 0x40
+CONTROL_ALMEN = (0x10, 0x20)
+
+# alarm matches seconds, minutes, hour, day of week, date and month
+ALARM_MATCH_ALL = 0x70
+
+
+def tobcd(val):
+    return (val % 10) | (val // 10) << 4
+
+
+def frombcd(val):
+    return (val >> 4) * 10 + (val & 0x0f)
+
+
+def rtc_weekday(dt):
+    # rtc-ds1307 uses weekday convention Sun = 1, Sat = 7
+    return (dt.weekday() + 1) % 7 + 1
+
+
+def _check_alarm(alarm):
+    if alarm not in (0, 1):
+        raise ValueError('alarm can only be 0 or 1')
+
+
+class MCP7940N(object):
+    """
+    The real time clock on the Papirus HAT
+
+    to use:
+      from papirus.rtc import MCP7940N
+
+      rtc = MCP7940N()                    # or MCP7940N(bus=SMBus(1)) to share a bus
+      now = rtc.read_time()               # one block read
+      rtc.set_alarm(0, now + timedelta(minutes=10))
+
+    The bus is opened once and kept. The control register is read along
+    with everything else by refresh() on first use and cached from then
+    on, so enabling, disabling or re-arming an alarm never needs a read
+    first. Call refresh() if something else (e.g. the kernel rtc driver)
+    may have changed the registers since.
+
+    The kernel driver claims the clock, so pass a bus from smbusf (see
+    RTC-Hat-Examples/py-smbusf) when it is loaded.
+    """
+
+    def __init__(self, busnum=1, address=MCP7940N_ADDRESS, bus=None):
+        if bus is None:
+            import smbus
+
+            bus = smbus.SMBus(busnum)
+
+        self._bus = bus
+        self._address = address
+        self._registers = None
+
+    def refresh(self):
+        """Read time, control and both alarms in one block, returns the registers"""
+        self._registers = bytearray(self._bus.read_i2c_block_data(self._address, TIME_REGISTER, REGISTER_COUNT))
+        return self._registers
+
+    def _cached(self):
+        if self._registers is None:
+            self.refresh()
+        return self._registers
+
+    @property
+    def control(self):
+        return self._cached()[CONTROL_REGISTER]
+
+    def write_control(self, value):
+        """Write the control register, skipped when it already holds value"""
+        if self._registers is not None and self._registers[CONTROL_REGISTER] == value:
+            return
+        self._bus.write_byte_data(self._address, CONTROL_REGISTER, value)
+        self._cached()[CONTROL_REGISTER] = value
+
+    def read_time(self):
+        data = self._bus.read_i2c_block_data(self._address, TIME_REGISTER, 7)
+        if self._registers is not None:
+            self._registers[TIME_REGISTER:TIME_REGISTER + 7] = bytearray(data)
+        return datetime(2000 + frombcd(data[6]), frombcd(data[5] & 0x1f), frombcd(data[4] & 0x3f),
+                        frombcd(data[2] & 0x3f), frombcd(data[1] & 0x7f), frombcd(data[0] & 0x7f))
+
+    def write_time(self, dt):
+        """Set the clock to dt and keep it running"""
+        # the status bits in the weekday register (e.g. VBATEN) are kept from the cache
+        status = self._cached()[TIME_REGISTER + 3] & WKDAY_STATUS_BITS
+        data = [
+            tobcd(dt.second) | ST_BIT,
+            tobcd(dt.minute),
+            tobcd(dt.hour),
+            status | rtc_weekday(dt),
+            tobcd(dt.day),
+            tobcd(dt.month) | (LPYR_BIT if isleap(dt.year) else 0),
+            tobcd(dt.year % 100),
+        ]
+        self._bus.write_i2c_block_data(self._address, TIME_REGISTER, data)
+        self._registers[TIME_REGISTER:TIME_REGISTER + 7] = bytearray(data)
+
+    def read_alarm(self, alarm):
+        """Return the alarm time (year 2000, the alarm has no year) from the cached registers"""
+        _check_alarm(alarm)
+        base = ALARM_REGISTERS[alarm]
+        data = self._cached()[base:base + 6]
+        return datetime(2000, frombcd(data[5] & 0x1f), frombcd(data[4] & 0x3f),
+                        frombcd(data[2] & 0x3f), frombcd(data[1] & 0x7f), frombcd(data[0] & 0x7f))
+
+    def alarm_enabled(self, alarm):
+        _check_alarm(alarm)
+        return bool(self.control & CONTROL_ALMEN[alarm])
+
+    def set_alarm(self, alarm, dt, enable=True):
+        """
+        Set alarm 0 or 1 to go off at dt
+
+        The alarm registers are one block write, which also clears the
+        alarm flag. The control register is only written as well when the
+        alarm was not enabled yet, so re-arming is a single transaction.
+        """
+        _check_alarm(alarm)
+        base = ALARM_REGISTERS[alarm]
+        # the weekday has to match the weekday of the rtc time for the alarm to trigger
+        data = [
+            tobcd(dt.second),
+            tobcd(dt.minute),
+            tobcd(dt.hour),
+            ALARM_MATCH_ALL | rtc_weekday(dt),
+            tobcd(dt.day),
+            tobcd(dt.month),
+        ]
+        self._bus.write_i2c_block_data(self._address, base, data)
+        self._cached()[base:base + 6] = bytearray(data)
+
+        if enable:
+            self.enable_alarm(alarm)
+
+    def enable_alarm(self, alarm):
+        _check_alarm(alarm)
+        self.write_control(self.control | CONTROL_ALMEN[alarm])
+
+    def disable_alarm(self, alarm):
+        _check_alarm(alarm)
+        # keep the mfp output high, otherwise we'll get an immediate reboot
+        self.write_control((self.control & ~CONTROL_ALMEN[alarm]) | CONTROL_OUT)
+
+    def square_wave(self, enabled):
+        """Output a 1 Hz square wave on the mfp pin, or stop it and set the output high
+
+        This also disables both alarms."""
+        self.write_control(CONTROL_SQWEN if enabled else CONTROL_OUT)
+
+    def set_output(self, value):
+        """Set the mfp output directly, disables the alarms and square wave"""
+        self.write_control(CONTROL_OUT if value else 0x00)
+
+
+class FakeSMBus(object):
+    """
+    An in memory I2C bus for testing without the hardware
+
+    to use:
+      bus = FakeSMBus()
+      rtc = MCP7940N(bus=bus)
+      rtc.set_alarm(0, datetime(2017, 1, 1, 12, 0))
+      bus.transactions                    # [('write_block', 0x6f, 0x0a, 6), ...]
+
+    Every device address gets its own 256 byte register file. Each call
+    is recorded in transactions as (operation, address, register, length).
+    """
+
+    def __init__(self, busnum=1):
+        self.busnum = busnum
+        self.registers = {}
+        self.transactions = []
+
+    def _device(self, address):
+        if address not in self.registers:
+            self.registers[address] = bytearray(256)
+        return self.registers[address]
+
+    def read_byte_data(self, address, register):
+        self.transactions.append(('read_byte', address, register, 1))
+        return self._device(address)[register]
+
+    def write_byte_data(self, address, register, value):
+        self.transactions.append(('write_byte', address, register, 1))
+        self._device(address)[register] = value & 0xff
+
+    def read_i2c_block_data(self, address, register, length=32):
+        if length > 32:
+            raise IOError('I2C block transfers are limited to 32 bytes')
+        self.transactions.append(('read_block', address, register, length))
+        return list(self._device(address)[register:register + length])
+
+    def write_i2c_block_data(self, address, register, data):
+        if len(data) > 32:
+            raise IOError('I2C block transfers are limited to 32 bytes')
+        self.transactions.append(('write_block', address, register, len(data)))
+        self._device(address)[register:register + len(data)] = bytearray(data)
+
+    def close(self):
+        pass
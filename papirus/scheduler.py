@@ -0,0 +1,150 @@
+from __future__ import division
+
+import math
+import threading
+import time
+
+from datetime import datetime
+
+# longest wait for the RTC seconds to roll over, in seconds
+RTC_EDGE_TIMEOUT = 1.5
+
+
+class TickStats(object):
+    """Lateness of pushes relative to their planned start (tick - lead), in seconds"""
+
+    def __init__(self):
+        self.ticks = 0
+        self.missed = 0
+        self.total_lateness = 0.0
+        self.max_lateness = 0.0
+        self.last_lateness = 0.0
+
+    def observe(self, lateness):
+        self.ticks += 1
+        self.total_lateness += lateness
+        self.max_lateness = max(self.max_lateness, lateness)
+        self.last_lateness = lateness
+
+    @property
+    def mean_lateness(self):
+        return self.total_lateness / self.ticks if self.ticks else 0.0
+
+    def __repr__(self):
+        return 'TickStats(ticks={t:d}, missed={m:d}, mean={a:.4f}s, max={x:.4f}s)'.format(
+            t=self.ticks, m=self.missed, a=self.mean_lateness, x=self.max_lateness)
+
+
+class TickScheduler(object):
+    """
+    Renders the frame for the next tick ahead of time and pushes it on the tick
+
+    to use:
+      from papirus.scheduler import TickScheduler
+
+      def render(when):       # when is the datetime of the tick
+          ...
+          return image
+
+      def push(image, when):
+          panel.display(image)
+          panel.partial_update()
+
+      scheduler = TickScheduler(render, push, [interval=1.0], [lead=0.0], [use_rtc=False])
+      scheduler.run()
+
+    Ticks fall on multiples of interval seconds of wall-clock time. The
+    process sleeps once per tick on the monotonic clock, so it is not
+    affected by the system clock being stepped, and wakes lead seconds
+    early to compensate for a known push latency. With use_rtc the wall
+    clock is taken from the RTC (papirus.readrtc.get_hwclock) every
+    discipline_interval seconds instead of from the system time. Ticks
+    that are already over when a push finishes are skipped and counted
+    as missed.
+    """
+
+    def __init__(self, render, push, interval=1.0, lead=0.0, use_rtc=False, discipline_interval=3600,
+                 devrtc='/dev/rtc'):
+        if interval <= 0:
+            raise ValueError('interval must be positive')
+
+        self.render = render
+        self.push = push
+        self.interval = interval
+        self.lead = lead
+        self.use_rtc = use_rtc
+        self.discipline_interval = discipline_interval
+        self.devrtc = devrtc
+        self.stats = TickStats()
+
+        # wall clock time = monotonic time + offset
+        self._offset = time.time() - time.monotonic()
+        self._disciplined_at = None
+        self._stop = threading.Event()
+
+    def now(self):
+        """Current wall clock time in seconds since the epoch"""
+        return time.monotonic() + self._offset
+
+    def discipline(self):
+        """Re-synchronise the wall clock with the system time or the RTC"""
+        if self.use_rtc:
+            from papirus.readrtc import close_hwclock, get_hwclock
+
+            # the RTC counts whole seconds, wait for the next one for a sharp edge;
+            # it never comes if the oscillator is stopped, then the system time is used
+            give_up = time.monotonic() + RTC_EDGE_TIMEOUT
+            try:
+                first = get_hwclock(self.devrtc, keep_open=True)
+                rtc = first
+                while rtc == first and time.monotonic() < give_up:
+                    time.sleep(0.01)
+                    rtc = get_hwclock(self.devrtc, keep_open=True)
+            finally:
+                close_hwclock(self.devrtc)
+            if rtc != first:
+                self._offset = (rtc - datetime(1970, 1, 1, tzinfo=rtc.tzinfo)).total_seconds() - time.monotonic()
+            else:
+                self._offset = time.time() - time.monotonic()
+        else:
+            self._offset = time.time() - time.monotonic()
+        self._disciplined_at = time.monotonic()
+
+    def next_tick(self, after=None):
+        """Wall clock time of the first tick after the given time"""
+        if after is None:
+            after = self.now()
+        return (math.floor(after / self.interval) + 1) * self.interval
+
+    def stop(self):
+        self._stop.set()
+
+    def run(self, count=None):
+        """Run until stop() is called, or for count ticks"""
+        self._stop.clear()
+        pushed = 0
+        if self._disciplined_at is None:
+            self.discipline()
+        tick = self.next_tick()
+
+        while not self._stop.is_set() and (count is None or pushed < count):
+            if time.monotonic() - self._disciplined_at >= self.discipline_interval:
+                self.discipline()
+
+            when = datetime.fromtimestamp(tick)
+            frame = self.render(when)
+
+            delay = tick - self.lead - self.now()
+            if delay > 0 and self._stop.wait(delay):
+                break
+
+            self.stats.observe(self.now() - (tick - self.lead))
+            self.push(frame, when)
+            pushed += 1
+
+            # skip the ticks that went by while rendering and pushing
+            following = self.next_tick(max(self.now(), tick))
+            self.stats.missed += max(int(round((following - tick) / self.interval)) - 1, 0)
+            tick = following
+
+        return self.stats
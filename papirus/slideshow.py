@@ -0,0 +1,227 @@
+from __future__ import division
+
+import os
+import random
+import re
+import threading
+import time
+
+try:
+    import queue
+except ImportError:
+    import Queue as queue
+
+from PIL import Image
+
+from papirus.loader import FIT_MODES, load_image
+
+WHITE = 1
+
+IMAGE_EXTENSIONS = ('.jpg', '.jpeg', '.png', '.bmp', '.gif')
+ORDERS = ('natural', 'name', 'mtime', 'random')
+
+_DIGITS_RE = re.compile(r'(\d+)')
+
+
+def natural_key(name):
+    """Sort key putting 2.gif before 10.gif"""
+    return [int(part) if part.isdigit() else part.lower() for part in _DIGITS_RE.split(name)]
+
+
+class Slideshow(object):
+    """
+    Shows the images of a directory, decoding ahead in a background thread
+
+    to use:
+      from papirus.slideshow import Slideshow
+
+      show = Slideshow(panel, '/path/to/pictures', [prefetch=4], [mode='fit'|'crop'|'stretch'],
+                       [order='natural'|'name'|'mtime'|'random'], [rescan_interval=60], [loop=True])
+      show.run(interval=10)
+
+    The directory is listed once and then only re-listed when its
+    modification time changes (checked at most every rescan_interval
+    seconds and at the end of every pass). A worker thread keeps up to
+    prefetch decoded and dithered frames ready, so memory stays bounded
+    however many images there are and showing a slide never waits on
+    decoding.
+    """
+
+    def __init__(self, panel, directory, prefetch=4, mode='fit', order='natural',
+                 extensions=IMAGE_EXTENSIONS, rescan_interval=None, border=0, loop=True):
+        if order not in ORDERS:
+            raise ValueError('order can only be natural, name, mtime or random')
+        if mode not in FIT_MODES:
+            raise ValueError('mode can only be fit, crop or stretch')
+        if 2 * border >= min(panel.size):
+            raise ValueError('border is too wide for the panel')
+
+        self.panel = panel
+        self.directory = directory
+        self.mode = mode
+        self.order = order
+        self.extensions = tuple(e.lower() for e in extensions)
+        self.rescan_interval = rescan_interval
+        # white pixels kept free around each image, e.g. 1 to avoid streaking with partial updates
+        self.border = border
+        # when False a single pass is shown
+        self.loop = loop
+        self.files = []
+
+        self._frames = queue.Queue(maxsize=max(prefetch, 1))
+        self._stop = threading.Event()
+        self._worker = None
+        self._dir_mtime = None
+        self._scanned_at = 0
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def scan(self):
+        """List the directory, returns the ordered image paths"""
+        entries = [e for e in os.scandir(self.directory)
+                   if e.is_file() and os.path.splitext(e.name)[1].lower() in self.extensions]
+
+        if self.order == 'natural':
+            entries.sort(key=lambda e: natural_key(e.name))
+        elif self.order == 'name':
+            entries.sort(key=lambda e: e.name)
+        elif self.order == 'mtime':
+            entries.sort(key=lambda e: e.stat().st_mtime)
+        else:
+            random.shuffle(entries)
+
+        self.files = [e.path for e in entries]
+        self._dir_mtime = os.stat(self.directory).st_mtime_ns
+        self._scanned_at = time.monotonic()
+        return self.files
+
+    def changed(self):
+        """True when the directory was modified since the last scan"""
+        return os.stat(self.directory).st_mtime_ns != self._dir_mtime
+
+    def start(self):
+        if self._worker is not None:
+            return
+        if self._dir_mtime is None:
+            self.scan()
+        self._stop.clear()
+        self._worker = threading.Thread(target=self._prefetch, name='papirus-slideshow')
+        self._worker.daemon = True
+        self._worker.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._worker is not None:
+            # unblock the worker if it is waiting for room
+            while not self._frames.empty():
+                self._frames.get_nowait()
+            self._worker.join()
+            self._worker = None
+
+    def next_frame(self, timeout=None):
+        """Return the next (path, image), None once a single pass is done"""
+        self.start()
+        return self._frames.get(timeout=timeout)
+
+    def run(self, interval=5.0, full_update_every=10):
+        """Show the slides, each for at least interval seconds
+
+        Every full_update_every-th slide uses a full update, the others a
+        partial update; 1 for full updates only.
+        """
+        self.start()
+        count = 0
+        try:
+            while True:
+                shown_at = time.monotonic()
+                try:
+                    frame = self._frames.get(timeout=0.5)
+                except queue.Empty:
+                    # the worker is behind, or stop() was called from another thread
+                    if self._stop.is_set() or not self._worker.is_alive():
+                        break
+                    continue
+                if frame is None:
+                    break
+
+                self.panel.display(frame[1])
+                if full_update_every <= 1 or count % full_update_every == 0:
+                    self.panel.update()
+                else:
+                    self.panel.partial_update()
+                count += 1
+
+                remaining = interval - (time.monotonic() - shown_at)
+                if remaining > 0:
+                    self._stop.wait(remaining)
+                if self._stop.is_set():
+                    break
+        finally:
+            self.stop()
+
+        return count
+
+    def _decode(self, path):
+        width, height = self.panel.size
+        image = load_image(path, (width - 2 * self.border, height - 2 * self.border), mode=self.mode)
+        if self.border == 0:
+            return image
+
+        frame = Image.new('1', self.panel.size, WHITE)
+        frame.paste(image, (self.border, self.border))
+        return frame
+
+    def _put(self, item):
+        # wait for room, giving up when stopped
+        while not self._stop.is_set():
+            try:
+                self._frames.put(item, timeout=0.5)
+                return True
+            except queue.Full:
+                pass
+        return False
+
+    def _prefetch(self):
+        index = 0
+        decoded = 0
+        while not self._stop.is_set():
+            if index >= len(self.files):
+                # end of a pass
+                if not self.loop:
+                    self._put(None)
+                    return
+                if self.changed():
+                    self.scan()
+                index = 0
+                if not decoded:
+                    # nothing (readable) to show, don't spin on the same files
+                    self._stop.wait(self.rescan_interval or 1.0)
+                decoded = 0
+                if not self.files:
+                    continue
+
+            path = self.files[index]
+            index += 1
+
+            if (self.rescan_interval is not None and
+                    time.monotonic() - self._scanned_at >= self.rescan_interval and self.changed()):
+                # carry on from the same file in the new listing
+                self.scan()
+                if path not in self.files:
+                    index = min(index - 1, len(self.files))
+                    continue
+                index = self.files.index(path) + 1
+
+            try:
+                image = self._decode(path)
+            except Exception:
+                # unreadable, removed since the scan or too big to decode
+                continue
+            decoded += 1
+            if not self._put((path, image)):
+                return
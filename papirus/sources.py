@@ -0,0 +1,212 @@
+from __future__ import division
+
+import fcntl
+import socket
+import struct
+import time
+
+from abc import abstractmethod
+
+SIOCGIFADDR = 0x8915
+
+
+class DataSource(object):
+    """
+    A value that is read at most once per interval seconds
+
+    Subclasses implement read(). value() returns the cached value and only
+    calls read() again once the interval has passed; interval None means
+    the value is read once and never again.
+    """
+
+    def __init__(self, interval=5.0, clock=time.monotonic):
+        self.interval = interval
+        self._clock = clock
+        self._value = None
+        self._read_at = None
+
+    @abstractmethod
+    def read(self):
+        pass
+
+    def expired(self):
+        if self._read_at is None:
+            return True
+        if self.interval is None:
+            return False
+        return self._clock() - self._read_at >= self.interval
+
+    def due_in(self):
+        """Seconds until the cached value expires, None if it never does"""
+        if self._read_at is None:
+            return 0.0
+        if self.interval is None:
+            return None
+        return max(self.interval - (self._clock() - self._read_at), 0.0)
+
+    def value(self):
+        if self.expired():
+            self._value = self.read()
+            self._read_at = self._clock()
+        return self._value
+
+    def invalidate(self):
+        self._read_at = None
+
+
+class IPAddressSource(DataSource):
+    """IPv4 address of a network interface, '0.0.0.0' when it has none"""
+
+    def __init__(self, ifname, interval=30.0, **kwargs):
+        super(IPAddressSource, self).__init__(interval, **kwargs)
+        self.ifname = ifname
+        self._socket = None
+
+    def read(self):
+        if self._socket is None:
+            self._socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        try:
+            request = struct.pack('256s', self.ifname[:15].encode('ISO-8859-1'))
+            return socket.inet_ntoa(fcntl.ioctl(self._socket.fileno(), SIOCGIFADDR, request)[20:24])
+        except (IOError, OSError):
+            return '0.0.0.0'
+
+
+class MACAddressSource(DataSource):
+    """Hardware address of a network interface, read once"""
+
+    def __init__(self, ifname, interval=None, **kwargs):
+        super(MACAddressSource, self).__init__(interval, **kwargs)
+        self.ifname = ifname
+
+    def read(self):
+        try:
+            with open('/sys/class/net/' + self.ifname + '/address') as f:
+                return f.read()[0:17]
+        except (IOError, OSError):
+            return '00:00:00:00:00:00'
+
+
+class CPULoadSource(DataSource):
+    """1, 5 or 15 minute load average from /proc/loadavg"""
+
+    def __init__(self, minutes=1, interval=5.0, **kwargs):
+        if minutes not in (1, 5, 15):
+            raise ValueError('minutes can only be 1, 5 or 15')
+        super(CPULoadSource, self).__init__(interval, **kwargs)
+        self._field = (1, 5, 15).index(minutes)
+
+    def read(self):
+        with open('/proc/loadavg') as f:
+            return float(f.read().split()[self._field])
+
+
+class TemperatureSource(DataSource):
+    """LM75B temperature in degrees Celsius, rounded to precision digits"""
+
+    def __init__(self, sensor=None, precision=1, interval=10.0, **kwargs):
+        super(TemperatureSource, self).__init__(interval, **kwargs)
+        self._sensor = sensor
+        self.precision = precision
+
+    def read(self):
+        if self._sensor is None:
+            from papirus.lm75b import LM75B
+
+            self._sensor = LM75B()
+        return round(self._sensor.getTempCFloat(), self.precision)
+
+
+class RTCTimeSource(DataSource):
+    """Date and time from the real time clock, keep_open keeps /dev/rtc open between reads"""
+
+    def __init__(self, devrtc='/dev/rtc', interval=1.0, keep_open=False, **kwargs):
+        super(RTCTimeSource, self).__init__(interval, **kwargs)
+        self.devrtc = devrtc
+        self.keep_open = keep_open
+
+    def read(self):
+        from papirus.readrtc import get_hwclock
+
+        return get_hwclock(self.devrtc, self.keep_open)
+
+
+class Binding(object):
+    def __init__(self, text_id, source, fmt, x, y, size, invert, font_path):
+        self.text_id = text_id
+        self.source = source
+        self.fmt = fmt
+        self.x = x
+        self.y = y
+        self.size = size
+        self.invert = invert
+        self.font_path = font_path
+        self.text = None
+
+
+class SourceBoard(object):
+    """
+    Text sprites bound to data sources, redrawn only when their text changes
+
+    to use:
+      from papirus import PapirusTextPos
+      from papirus.sources import SourceBoard, IPAddressSource, TemperatureSource
+
+      board = SourceBoard(PapirusTextPos(panel, auto_update=False))
+      board.bind('ip', IPAddressSource('wlan0'), 'wlan0 IP: {}', x=4, y=16, size=12)
+      board.bind('temp', TemperatureSource(), '{:.1f} C', x=4, y=30, size=12)
+      board.run()
+
+    refresh() polls the sources whose interval has passed, re-renders the
+    sprites whose formatted text differs from what is on screen and, if any
+    did, pushes the frame once with a partial update. Nothing is drawn or
+    sent to the panel when nothing changed.
+    """
+
+    def __init__(self, textpos, partial_update=True):
+        self.textpos = textpos
+        self.partial_update = partial_update
+        self.bindings = []
+
+    def bind(self, text_id, source, fmt='{}', x=0, y=0, size=20, invert=False, font_path=None):
+        binding = Binding(text_id, source, fmt, x, y, size, invert, font_path)
+        self.bindings.append(binding)
+        return binding
+
+    def refresh(self, force=False):
+        """Update changed sprites, returns True if the panel was updated"""
+        auto_update = self.textpos.auto_update
+        self.textpos.auto_update = False
+        changed = False
+        try:
+            for binding in self.bindings:
+                text = binding.fmt.format(binding.source.value())
+                if text == binding.text:
+                    continue
+                if binding.text is None:
+                    self.textpos.add_text_sprite(text, binding.x, binding.y, binding.size, binding.text_id,
+                                                 binding.invert, binding.font_path)
+                else:
+                    self.textpos.update_text(binding.text_id, text, binding.font_path)
+                binding.text = text
+                changed = True
+        finally:
+            self.textpos.auto_update = auto_update
+
+        if changed or force:
+            self.textpos.write_all(partial_update=self.partial_update)
+        return changed
+
+    def next_due(self):
+        """Seconds until the next source expires, None if none ever will"""
+        due = [d for d in (b.source.due_in() for b in self.bindings) if d is not None]
+        return min(due) if due else None
+
+    def run(self, min_interval=0.5):
+        """Refresh for ever, sleeping until the next source is due"""
+        while True:
+            self.refresh()
+            due = self.next_due()
+            if due is None:
+                return
+            time.sleep(max(due, min_interval))
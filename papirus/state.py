@@ -0,0 +1,75 @@
+# Persisted screen state
+#
+# File layout (all integers little endian):
+#
+#   magic    4 bytes   'PSTA'
+#   length   uint32    length of the metadata
+#   metadata           UTF-8 JSON, the panel rotation and the sprites keyed by id
+#   frame              the composed frame in papirus.bitmap format (compressed)
+#
+
+import json
+import os
+import struct
+
+from papirus.bitmap import BitmapError, pack_bitmap, unpack_bitmap
+
+
+STATE_MAGIC = b'PSTA'
+
+_HEADER = struct.Struct('<4sI')
+
+
+class ScreenState(object):
+    """
+    Snapshot of what is on the panel, so it survives a restart
+
+    to use:
+      state = ScreenState('/var/lib/papirus/screen.state')
+      state.save(image, {'clock': {'type': 'text', 'x': 0, ...}}, rotation=panel.rotation)
+      image, sprites, rotation = state.load()     # None if there is no usable state
+    """
+
+    def __init__(self, path):
+        self.path = path
+
+    def exists(self):
+        return os.path.exists(self.path)
+
+    def save(self, image, sprites, rotation=0):
+        meta = {'rotation': rotation, 'sprites': sprites}
+        meta = json.dumps(meta, sort_keys=True, separators=(',', ':')).encode('utf-8')
+        data = _HEADER.pack(STATE_MAGIC, len(meta)) + meta + pack_bitmap(image, compress=True)
+
+        # write to a temporary file first so a crash never leaves a partial state
+        tmp_path = self.path + '.tmp'
+        with open(tmp_path, 'wb') as f:
+            f.write(data)
+        os.rename(tmp_path, self.path)
+
+    def load(self):
+        """Return (image, sprites, rotation), or None if the state is missing or unreadable"""
+        try:
+            with open(self.path, 'rb') as f:
+                data = f.read()
+        except (IOError, OSError):
+            return None
+
+        if len(data) < _HEADER.size:
+            return None
+        magic, length = _HEADER.unpack(data[:_HEADER.size])
+        if magic != STATE_MAGIC:
+            return None
+
+        try:
+            meta = json.loads(data[_HEADER.size:_HEADER.size + length].decode('utf-8'))
+            sprites, rotation = meta['sprites'], meta['rotation']
+            image = unpack_bitmap(data[_HEADER.size + length:])
+        except (ValueError, KeyError, TypeError, BitmapError):
+            return None
+
+        return image, sprites, rotation
+
+    def remove(self):
+        if self.exists():
+            os.remove(self.path)
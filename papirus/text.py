@@ -3,47 +3,78 @@ from PIL import Image, ImageDraw, ImageFont
 WHITE = 1
 BLACK = 0
 
+DEFAULT_FONT_PATH = '/usr/share/fonts/truetype/freefont/FreeMono.ttf'
 
-class PapirusText(object):
-    DEFAULT_FONT_PATH = '/usr/share/fonts/truetype/freefont/FreeMono.ttf'
 
-    def __init__(self, panel):
-        self.panel = panel
+def render_text(text, panel_size, size=20, font_path=None, max_lines=100):
+    """Word wrap text onto a new single bit image of panel_size"""
+    # initially set all white background
+    image = Image.new('1', panel_size, WHITE)
 
-    def write(self, text, size=20, font_path=None, max_lines=100):
-        # initially set all white background
-        image = Image.new('1', self.panel.size, WHITE)
+    # prepare for drawing
+    draw = ImageDraw.Draw(image)
 
-        # prepare for drawing
-        draw = ImageDraw.Draw(image)
+    font = ImageFont.truetype(font_path or DEFAULT_FONT_PATH, size)
 
-        font = ImageFont.truetype(font_path or self.DEFAULT_FONT_PATH, size)
+    # Calculate the max number of char to fit on line
+    # lineSize = (self.papirus.width / (size * 0.65))
 
-        # Calculate the max number of char to fit on line
-        # lineSize = (self.papirus.width / (size * 0.65))
+    current_line = 0
+    # unicode by default
+    text_lines = [u""]
 
-        current_line = 0
-        # unicode by default
-        text_lines = [u""]
-
-        # Compute each line
-        for word in text.split():
-            # Always add first word (even when it is too long)
-            if len(text_lines[current_line]) == 0:
+    # Compute each line
+    for word in text.split():
+        # Always add first word (even when it is too long)
+        if len(text_lines[current_line]) == 0:
+            text_lines[current_line] += word
+        elif (draw.textsize(text_lines[current_line] + " " + word, font=font)[0]) < panel_size[0]:
+            text_lines[current_line] += " " + word
+        else:
+            # No space left on line so move to next one
+            text_lines.append(u"")
+            if current_line < max_lines:
+                current_line += 1
                 text_lines[current_line] += word
-            elif (draw.textsize(text_lines[current_line] + " " + word, font=font)[0]) < self.panel.width:
-                text_lines[current_line] += " " + word
-            else:
-                # No space left on line so move to next one
-                text_lines.append(u"")
-                if current_line < max_lines:
-                    current_line += 1
-                    text_lines[current_line] += word
-
-        current_line = 0
-        for l in text_lines:
-            draw.text((0, size * current_line), l, font=font, fill=BLACK)
-            current_line += 1
+
+    current_line = 0
+    for l in text_lines:
+        draw.text((0, size * current_line), l, font=font, fill=BLACK)
+        current_line += 1
+
+    return image
+
+
+class PapirusText(object):
+    """
+    Word wrapped text filling the panel
+
+    to use:
+      text = PapirusText(panel, [page_cache=PageCache()])
+      text.write('hello world', [size=20], [font_path=None])
+
+    With a page_cache, written pages are kept as ready to send frames and
+    writing the same page again is only a panel write; prerender() fills
+    the cache ahead of time.
+    """
+
+    DEFAULT_FONT_PATH = DEFAULT_FONT_PATH
+
+    def __init__(self, panel, page_cache=None):
+        self.panel = panel
+        self.page_cache = page_cache
+
+    def write(self, text, size=20, font_path=None, max_lines=100):
+        if self.page_cache is not None:
+            image = self.page_cache.get(self.panel, text, size, font_path, max_lines)
+        else:
+            image = render_text(text, self.panel.size, size, font_path, max_lines)
 
         self.panel.display(image)
         self.panel.update()
+
+    def prerender(self, pages, size=20, font_path=None, max_lines=100):
+        """Render pages (a list of texts) into the page cache in the background, returns how many were started"""
+        if self.page_cache is None:
+            raise ValueError('prerender needs a page_cache')
+        return self.page_cache.prerender(self.panel, pages, size, font_path, max_lines)
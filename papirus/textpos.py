@@ -1,13 +1,24 @@
 import uuid
 
-from PIL import Image, ImageDraw, ImageFont
+from PIL import Image, ImageChops, ImageDraw, ImageFont
 
 from papirus.sprite import Sprite
+from papirus.state import ScreenState
 
 
 WHITE = 1
 BLACK = 0
 
+# Loaded fonts by (path, size), so redrawing a sprite doesn't parse the font file again
+_fonts = dict()
+
+
+def _load_font(font_path, size):
+    key = (font_path, size)
+    if key not in _fonts:
+        _fonts[key] = ImageFont.truetype(font_path, size)
+    return _fonts[key]
+
 
 class TextSprite(Sprite):
     """
@@ -22,13 +33,26 @@ class TextSprite(Sprite):
 class PapirusTextPos(object):
     DEFAULT_FONT_PATH = '/usr/share/fonts/truetype/freefont/FreeMono.ttf'
 
-    def __init__(self, panel, auto_update=True):
+    def __init__(self, panel, auto_update=True, state_path=None):
         self.panel = panel
         self.text_cache = dict()
         self.image = Image.new('1', self.panel.size, WHITE)
         self.auto_update = auto_update
         self.partial_updates = False
 
+        # When set, once the panel holds the frame write_all only sends the rows
+        # that differ from the last frame written; only for a panel nothing
+        # else writes to
+        self.region_writes = False
+        self._written = None
+
+        # Optionally keep the frame and sprites in a file, so after a restart
+        # the first write only needs a partial update instead of clear and redraw
+        self.state = ScreenState(state_path) if state_path is not None else None
+        self.restored = False
+        if self.state is not None:
+            self._restore_state()
+
     def add_text_sprite(self, text, x=0, y=0, size=20, text_id=None, invert=False, font_path=None, max_lines=100):
         # Create a new Id if none is supplied
         if text_id is None:
@@ -102,7 +126,7 @@ class PapirusTextPos(object):
         draw = ImageDraw.Draw(self.image)
 
         # Grab the font to use, fixed at the moment
-        font = ImageFont.truetype(font_path or self.DEFAULT_FONT_PATH, size)
+        font = _load_font(font_path or self.DEFAULT_FONT_PATH, size)
 
         # Calculate the max number of char to fit on line
         # Taking in to account the X starting position
@@ -180,14 +204,59 @@ class PapirusTextPos(object):
     def write_all(self, partial_update=False):
         # Push the image to the PaPiRus device, and update only what's needed
         # (unless asked to do a full update)
-        self.panel.display(self.image)
-        if partial_update or self.partial_updates:
+        # A restored screen is already on the panel, so only the differences are needed
+        bbox = None
+        if self.region_writes and self._written is not None:
+            # compared with what was written, so drawing straight on self.image is included
+            bbox = ImageChops.difference(self._written, self.image).getbbox() or (0, 0, 0, 0)
+        self.panel.display(self.image, bbox=bbox)
+        if partial_update or self.partial_updates or self.restored:
             self.panel.partial_update()
         else:
             self.panel.update()
+        self.restored = False
+        self._written = self.image.copy() if self.region_writes else None
+        self._save_state()
 
     def clear(self):
         # clear the image, clear the text items, do a full update to the screen
         self.image = Image.new('1', self.panel.size, WHITE)
         self.text_cache = dict()
         self.panel.clear()
+        self.restored = False
+        self._written = None
+        self._save_state()
+
+    def _save_state(self):
+        if self.state is not None:
+            self.state.save(self.image, self._sprite_state(), self.panel.rotation)
+
+    def _sprite_state(self):
+        sprites = dict()
+        for text_id, sprite in self.text_cache.items():
+            sprites[text_id] = {'type': 'text', 'text': sprite.text, 'x': sprite.x, 'y': sprite.y,
+                                'size': sprite.size, 'invert': sprite.invert,
+                                'endx': sprite.endx, 'endy': sprite.endy}
+        return sprites
+
+    def _restore_state(self):
+        loaded = self.state.load()
+        if loaded is None:
+            return
+
+        image, sprites, rotation = loaded
+        # Ignore a state saved for another panel size or rotation
+        if image.size != self.panel.size or rotation != self.panel.rotation:
+            return
+
+        self.image = image
+        for sprite_id, data in sprites.items():
+            self._restore_sprite(sprite_id, data)
+        self.restored = True
+
+    def _restore_sprite(self, sprite_id, data):
+        if data['type'] == 'text':
+            sprite = TextSprite(data['text'], data['x'], data['y'], data['size'], data['invert'])
+            sprite.endx = data['endx']
+            sprite.endy = data['endy']
+            self.text_cache[sprite_id] = sprite
@@ -0,0 +1,215 @@
+from __future__ import division
+
+import random
+import time
+
+from collections import deque
+
+from PIL import Image
+from PIL import ImageDraw
+
+WHITE = 1
+BLACK = 0
+
+EMPTY = 0
+
+
+def square_tile(size, color=BLACK):
+    """A cell completely filled with color"""
+    return Image.new('1', (size, size), color)
+
+
+def circle_tile(size, color=BLACK):
+    """A filled circle on a white cell"""
+    tile = Image.new('1', (size, size), WHITE)
+    ImageDraw.Draw(tile).ellipse([(0, 0), (size - 1, size - 1)], fill=color, outline=color)
+    return tile
+
+
+class TileGrid(object):
+    """
+    A grid of cells drawn with pre-rendered tiles into a reused frame
+
+    to use:
+      from papirus.tiles import TileGrid, square_tile
+
+      grid = TileGrid(panel.size, cell_size=8)
+      grid.define(1, square_tile(8))
+      grid.set(3, 4, 1)
+      box = grid.render()         # bounding box of what changed, or None
+      panel.display(grid.image, bbox=box)
+
+    Cell contents live in a bytearray (one byte per cell, 0 is empty), so
+    reading or changing a cell is O(1). Only cells changed since the last
+    render are pasted into the frame.
+    """
+
+    def __init__(self, size, cell_size=8, background=WHITE):
+        self.cell_size = cell_size
+        self.columns = size[0] // cell_size
+        self.rows = size[1] // cell_size
+        self.image = Image.new('1', size, background)
+
+        self._cells = bytearray(self.columns * self.rows)
+        self._tiles = {EMPTY: Image.new('1', (cell_size, cell_size), background)}
+        self._dirty = set()
+        self._count = 0
+
+    def define(self, value, tile):
+        """Use tile (a cell_size square single bit image) for cells holding value"""
+        if not 0 < value < 256:
+            raise ValueError('tile values must be 1 to 255')
+        if tile.size != (self.cell_size, self.cell_size):
+            raise ValueError('tile size must match the cell size')
+        self._tiles[value] = tile.convert('1')
+
+    def get(self, x, y):
+        return self._cells[y * self.columns + x]
+
+    def is_free(self, x, y):
+        return self._cells[y * self.columns + x] == EMPTY
+
+    def set(self, x, y, value):
+        i = y * self.columns + x
+        old = self._cells[i]
+        if old == value:
+            return
+        self._count += (value != EMPTY) - (old != EMPTY)
+        self._cells[i] = value
+        self._dirty.add(i)
+
+    def clear_cell(self, x, y):
+        self.set(x, y, EMPTY)
+
+    def random_free(self, area=None, rng=random):
+        """Return a random free (x, y) inside area (x1, y1, x2, y2 inclusive), None if full"""
+        x1, y1, x2, y2 = area if area is not None else (0, 0, self.columns - 1, self.rows - 1)
+
+        # a few random probes are enough unless the grid is nearly full
+        if self._count < len(self._cells) // 2:
+            for _ in range(32):
+                x = rng.randint(x1, x2)
+                y = rng.randint(y1, y2)
+                if self.is_free(x, y):
+                    return x, y
+
+        free = [(x, y) for y in range(y1, y2 + 1) for x in range(x1, x2 + 1) if self.is_free(x, y)]
+        return rng.choice(free) if free else None
+
+    @property
+    def dirty(self):
+        return bool(self._dirty)
+
+    def render(self):
+        """Paste the changed cells into image, returns their bounding box or None"""
+        if not self._dirty:
+            return None
+
+        size = self.cell_size
+        xs = []
+        ys = []
+        for i in self._dirty:
+            y, x = divmod(i, self.columns)
+            self.image.paste(self._tiles[self._cells[i]], (x * size, y * size))
+            xs.append(x)
+            ys.append(y)
+        self._dirty.clear()
+
+        return min(xs) * size, min(ys) * size, (max(xs) + 1) * size, (max(ys) + 1) * size
+
+
+class Body(object):
+    """
+    A chain of cells on a grid, e.g. a snake, head first
+
+    Moving is O(1): the new head is added to one end of a deque and the
+    tail taken off the other, and collisions are checked against the
+    grid occupancy instead of scanning the body.
+    """
+
+    def __init__(self, grid, cells, value):
+        self.grid = grid
+        self.value = value
+        self.cells = deque()
+        for x, y in cells:
+            self.cells.append((x, y))
+            grid.set(x, y, value)
+
+    def __len__(self):
+        return len(self.cells)
+
+    @property
+    def head(self):
+        return self.cells[0]
+
+    def move(self, x, y, grow=False):
+        """Move the head to (x, y), returns the freed tail cell or None when growing"""
+        tail = None
+        if not grow:
+            tail = self.cells.pop()
+            self.grid.clear_cell(*tail)
+        self.cells.appendleft((x, y))
+        self.grid.set(x, y, self.value)
+        return tail
+
+
+class GameLoop(object):
+    """
+    Runs a game step function and shows its changes with fast updates
+
+    to use:
+      def step():
+          ...              # move things on grid
+          return True      # False ends the game
+
+      GameLoop(panel, grid, step, [frame_time=0]).run()
+
+    A frame is only sent to the panel when cells changed, and after the
+    first one only the rows holding the changed cells. frame_time is
+    the minimum time between steps; the panel refresh itself usually sets
+    the pace. If the panel has a stagetime (EPD), set_stagetime changes it
+    only when the value differs and the original is restored afterwards.
+    """
+
+    def __init__(self, panel, grid, step, frame_time=0.0):
+        self.panel = panel
+        self.grid = grid
+        self.step = step
+        self.frame_time = frame_time
+        self.frames = 0
+        self._stagetime = None
+        self._original_stagetime = None
+
+    def set_stagetime(self, stagetime):
+        # checked in this order as reading an EPD stagetime means reading a file
+        if stagetime == self._stagetime or not hasattr(self.panel, 'stagetime'):
+            return
+        if self._original_stagetime is None:
+            self._original_stagetime = self.panel.stagetime
+        self.panel.stagetime = stagetime
+        self._stagetime = stagetime
+
+    def run(self):
+        try:
+            while True:
+                started = time.monotonic()
+                if not self.step():
+                    break
+
+                box = self.grid.render()
+                if box is not None:
+                    # the first frame is written whole, the panel may hold anything
+                    self.panel.display(self.grid.image, bbox=box if self.frames else None)
+                    self.panel.fast_update()
+                    self.frames += 1
+
+                remaining = self.frame_time - (time.monotonic() - started)
+                if remaining > 0:
+                    time.sleep(remaining)
+        finally:
+            if self._original_stagetime is not None:
+                self.panel.stagetime = self._original_stagetime
+                self._stagetime = None
+                self._original_stagetime = None
+
+        return self.frames